@@ -0,0 +1,101 @@
+# benchmarks/bench_agent_loop.py
+"""
+Measures the agent loop's own per-turn overhead (history building, reloads,
+tool dispatch, logging) by driving AIComponentManager against a scripted
+local Gemini stand-in with no model latency.
+
+Scenarios: a text-only answer, one tool call, and four parallel tool calls
+per turn, each served in-process and over a localhost HTTP server.
+
+Run from the project root:
+    python -m benchmarks.bench_agent_loop
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_component_discovery import write_synthetic_components
+from src.ai_manager import AIComponentManager
+from src.fake_gemini import (
+    FakeGeminiBackend,
+    FakeGeminiClient,
+    FakeGeminiServer,
+    function_call_chunk,
+    text_chunk,
+)
+from src.gemini_chat_agent import create_gemini_client
+from src.headless_runner import HeadlessRunner
+from src.rate_limiter import RateLimiter
+
+TURNS = 200
+COMPONENT_COUNT = 20
+
+TOOL_CALL = {"name": "SyntheticComponent0", "args": {"text": "benchmark", "repeat": 3}}
+
+SCENARIOS = {
+    "text": [[text_chunk("Thinking "), text_chunk("about "), text_chunk("it.")]],
+    "1 tool call": [
+        [text_chunk("Let me check. "), function_call_chunk(TOOL_CALL)],
+        [text_chunk("Done.")],
+    ],
+    "4 tool calls": [
+        [function_call_chunk(*[
+            {"name": f"SyntheticComponent{i}", "args": {"text": "benchmark"}} for i in range(4)
+        ])],
+        [text_chunk("Done.")],
+    ],
+}
+
+
+def run_scenario(components_dir: str, script, transport: str) -> dict:
+    backend = FakeGeminiBackend(script, cycle=True)
+    server = None
+    if transport == "http":
+        server = FakeGeminiServer(backend).start()
+        os.environ["GEMINI_API_BASE_URL"] = server.base_url
+        client = create_gemini_client("fake-key")
+    else:
+        client = FakeGeminiClient(backend)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ai_manager = AIComponentManager(
+                components_dir=components_dir,
+                system_prompt="You are a benchmark.",
+                gemini_client=client,
+                rate_limiter=RateLimiter(requests_per_minute=None),
+            )
+            runner = HeadlessRunner(ai_manager, max_turns=TURNS)
+            runner.run()
+        summary = runner.summary()
+        summary["requests"] = backend.requests
+        return summary
+    finally:
+        if server:
+            server.stop()
+            os.environ.pop("GEMINI_API_BASE_URL", None)
+
+
+def main():
+    print(f"{'scenario':>14} {'transport':>10} {'requests':>9} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    with tempfile.TemporaryDirectory() as components_dir:
+        write_synthetic_components(components_dir, COMPONENT_COUNT)
+        for name, script in SCENARIOS.items():
+            for transport in ("in-process", "http"):
+                try:
+                    summary = run_scenario(components_dir, script, transport)
+                except Exception as e:
+                    print(f"{name:>14} {transport:>10} failed: {e}")
+                    continue
+                print(
+                    f"{name:>14} {transport:>10} {summary['requests']:>9} "
+                    + " ".join(f"{summary[key] * 1000:>7.2f}ms" for key in ("mean", "p50", "p95", "max"))
+                )
+
+
+if __name__ == "__main__":
+    main()
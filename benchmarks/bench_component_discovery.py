@@ -0,0 +1,99 @@
+# benchmarks/bench_component_discovery.py
+"""
+Compares cold-start component discovery time for sequential and parallel
+imports over 10/100/1000 synthetic components.
+
+Run from the project root:
+    python -m benchmarks.bench_component_discovery
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.manager import ComponentManager
+
+COMPONENT_COUNTS = [10, 100, 1000]
+REPEATS = 3
+
+SYNTHETIC_COMPONENT = '''
+from src.base_component import BaseComponent
+
+
+class {class_name}(BaseComponent):
+    """Synthetic component number {index} used for discovery benchmarks."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.calls = 0
+
+    def onload(self):
+        pass
+
+    def use(self, text: str, repeat: int = 1) -> str:
+        """
+        Repeats and reverses the given text.
+
+        Args:
+            text: The text to transform.
+            repeat: How many times to repeat it.
+        Returns:
+            The transformed text.
+        """
+        self.calls += 1
+        return (text * repeat)[::-1]
+
+{helpers}
+    def destroy(self):
+        pass
+'''
+
+HELPER_METHOD = '''
+    def _helper_{n}(self, values: list) -> dict:
+        result = {{}}
+        for i, value in enumerate(values):
+            if i % 2:
+                result[str(i)] = [value, value * {n}, str(value).upper()]
+            else:
+                result[str(i)] = {{"value": value, "index": i, "n": {n}}}
+        return result
+'''
+
+
+def write_synthetic_components(directory: str, count: int):
+    helpers = "".join(HELPER_METHOD.format(n=n) for n in range(10))
+    for index in range(count):
+        class_name = f"SyntheticComponent{index}"
+        with open(os.path.join(directory, f"synthetic_component_{index}.py"), "w") as f:
+            f.write(SYNTHETIC_COMPONENT.format(class_name=class_name, index=index, helpers=helpers))
+
+
+def time_discovery(directory: str, parallel: bool) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        # Without the bytecode cache, so every run compiles from source like a cold start
+        manager = ComponentManager(directory, parallel_discovery=parallel, use_bytecode_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            manager.refresh_components()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return best
+
+
+def main():
+    print(f"{'components':>10} {'sequential':>12} {'parallel':>12} {'speedup':>8}")
+    for count in COMPONENT_COUNTS:
+        with tempfile.TemporaryDirectory() as directory:
+            write_synthetic_components(directory, count)
+            sequential = time_discovery(directory, parallel=False)
+            parallel = time_discovery(directory, parallel=True)
+        print(f"{count:>10} {sequential * 1000:>10.1f}ms {parallel * 1000:>10.1f}ms {sequential / parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
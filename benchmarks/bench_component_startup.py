@@ -0,0 +1,50 @@
+# benchmarks/bench_component_startup.py
+"""
+Measures component startup time without the bytecode cache, with a cold
+cache (first run, which also populates it) and with a warm cache (as after a
+process restart).
+
+Run from the project root:
+    python -m benchmarks.bench_component_startup
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_component_discovery import write_synthetic_components
+from src.manager import ComponentManager
+
+COMPONENT_COUNTS = [10, 100, 1000]
+
+
+def time_startup(directory: str, use_bytecode_cache: bool, cache_dir: str) -> float:
+    manager = ComponentManager(
+        directory, use_bytecode_cache=use_bytecode_cache, bytecode_cache_dir=cache_dir
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        manager.refresh_components()
+        return time.perf_counter() - start
+
+
+def main():
+    print(f"{'components':>10} {'no cache':>12} {'cold cache':>12} {'warm cache':>12} {'speedup':>8}")
+    for count in COMPONENT_COUNTS:
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as cache_dir:
+            write_synthetic_components(directory, count)
+            uncached = min(time_startup(directory, False, cache_dir) for _ in range(3))
+            cold = time_startup(directory, True, cache_dir)
+            warm = min(time_startup(directory, True, cache_dir) for _ in range(3))
+        print(
+            f"{count:>10} {uncached * 1000:>10.1f}ms {cold * 1000:>10.1f}ms "
+            f"{warm * 1000:>10.1f}ms {uncached / warm:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
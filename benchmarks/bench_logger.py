@@ -0,0 +1,93 @@
+# benchmarks/bench_logger.py
+"""
+Measures the per-call cost of log_message for streaming-style output (many
+short chunks without newlines), comparing the original implementation
+(level table rebuilt and stdout flushed on every call) with the current
+synchronous and background-writer modes, with and without colors.
+
+Output goes to a real file so writes and flushes cost what they do in practice.
+
+Run from the project root:
+    python -m benchmarks.bench_logger
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import logger
+from src.colors import (
+    BOLD, BRIGHT_BLACK, BRIGHT_BLUE, BRIGHT_CYAN, BRIGHT_RED, BRIGHT_YELLOW,
+    CYAN, GREEN, MAGENTA, RED, RESET, WHITE, YELLOW,
+)
+
+CALLS = 100_000
+CHUNK = "streamed text chunk "
+
+
+def legacy_log_message(level, message, color=WHITE, symbol="", end="\n"):
+    """
+    log_message as it was before the module-level level table and buffering.
+    """
+    level_map = {
+        "USER": (BRIGHT_BLUE, "👤 "),
+        "AI_INTERNAL_PROMPT": (BRIGHT_CYAN, "💭 "),
+        "AI_THOUGHT": (CYAN, "💡 "),
+        "AI_ACTION": (MAGENTA, "🚀 "),
+        "AI_TOOL_RESULT": (GREEN, "✅ "),
+        "AI_API_ERROR": (BRIGHT_RED, "❌ "),
+        "AI_UNEXPECTED_ERROR": (RED, "💥 "),
+        "SYSTEM_INIT": (BOLD + GREEN, "✨ "),
+        "SYSTEM_RELOAD": (BOLD + YELLOW, "🔄 "),
+        "SYSTEM_TOOL_BUILD": (YELLOW, "🛠️ "),
+        "SYSTEM_EXIT": (BRIGHT_BLACK, "👋 "),
+        "RATE_LIMIT": (BRIGHT_YELLOW, "⏳ "),
+        "WARNING": (YELLOW, "⚠️ "),
+    }
+    lvl_color, lvl_symbol = level_map.get(level, (color, symbol))
+    log_string = f"{lvl_color}{lvl_symbol}{message}{RESET}"
+    sys.stdout.write(log_string + end)
+    sys.stdout.flush()
+
+
+def time_calls(log, output) -> float:
+    """
+    Returns the mean time per call in microseconds, including draining any queued output.
+    """
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            log("AI_THOUGHT", CHUNK, end="")
+        logger.flush_logs()
+        elapsed = time.perf_counter() - start
+    return elapsed / CALLS * 1e6
+
+
+def main():
+    scenarios = [
+        ("legacy (flush per call)", legacy_log_message, None, None, False),
+        # A TTY: flush per call, like interactive use
+        ("sync, colors, flush per call", logger.log_message, True, True, False),
+        ("sync, no colors, buffered", logger.log_message, False, False, False),
+        ("async writer, colors", logger.log_message, True, True, True),
+        ("async writer, no colors", logger.log_message, False, False, True),
+    ]
+    print(f"{'mode':>30} {'per call':>10}")
+    with tempfile.TemporaryFile("w", encoding="utf-8") as output:
+        for name, log, colors, flush_each_write, use_async in scenarios:
+            logger.set_colors_enabled(colors)
+            logger._flush_each_write = flush_each_write
+            if use_async:
+                logger.start_async_logging()
+            try:
+                per_call = time_calls(log, output)
+            finally:
+                logger.stop_async_logging()
+            print(f"{name:>30} {per_call:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
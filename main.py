@@ -1,5 +1,7 @@
 # main.py
+import argparse
 import os
+import sys
 
 from dotenv import load_dotenv
 
@@ -7,8 +9,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from src.ai_manager import AIComponentManager
+from src.headless_runner import HeadlessRunner, file_feed, stdin_feed
+from src.event_log import configure_event_log
+from src.logger import start_async_logging
+from src.tracing import FlameSummaryExporter, JsonlExporter, OtlpFileExporter, add_exporter
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the autonomous component AI.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without prompting; messages come from --feed or piped stdin.")
+    parser.add_argument("--feed", help="File with one interrupt message per line ('-' for stdin).")
+    parser.add_argument("--turns", type=int, help="Number of turns to run in headless mode.")
+    parser.add_argument("--timings", help="Write per-turn timings as JSON to this file.")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", metavar="CASSETTE",
+                                help="Record every model request and response to this file.")
+    cassette_group.add_argument("--replay", metavar="CASSETTE",
+                                help="Answer model requests from a recorded file instead of the API.")
+    parser.add_argument("--async-logging", action="store_true",
+                        help="Write log output from a background thread in batches.")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="Write structured events (requests, tool calls, reloads, waits) as JSON lines.")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Write trace spans to this file (OTLP/JSON, or span JSON lines if it ends in .jsonl).")
+    parser.add_argument("--trace-summary", action="store_true",
+                        help="Print a flame-style time breakdown after every turn.")
+    args = parser.parse_args()
+    if args.headless and args.feed is None and args.turns is None and sys.stdin.isatty():
+        # Nothing would end the run: no feed to exhaust and no turn limit
+        parser.error("--headless on a terminal needs --feed or --turns (or messages piped to stdin).")
+
+    if args.async_logging:
+        start_async_logging()
+    if args.event_log:
+        configure_event_log(args.event_log)
+    if args.trace:
+        add_exporter(JsonlExporter(args.trace) if args.trace.endswith(".jsonl") else OtlpFileExporter(args.trace))
+    if args.trace_summary:
+        add_exporter(FlameSummaryExporter())
+
     # Define the initial system prompt, outlining the AI's purpose and goal.
     initial_ai_goal = """
     ## Initializing Project Genesis Core AI...
@@ -105,8 +144,19 @@ if __name__ == "__main__":
             components_dir="./src/components",
             api_key=os.environ.get("GEMINI_API_KEY"),
             system_prompt=initial_ai_goal,
+            cassette_path=args.record or args.replay,
+            cassette_mode="record" if args.record else "replay" if args.replay else None,
         )
-        ai_manager.start_autonomous_loop()
+        if args.headless:
+            if args.feed == "-" or (args.feed is None and not sys.stdin.isatty()):
+                feed = stdin_feed()
+            elif args.feed:
+                feed = file_feed(args.feed)
+            else:
+                feed = None
+            HeadlessRunner(ai_manager, feed=feed, max_turns=args.turns, timings_path=args.timings).run()
+        else:
+            ai_manager.start_autonomous_loop()
     except ValueError as e:
         print(f"Initialization error: {e}")
         print(
@@ -1,15 +1,25 @@
 # src/ai_manager.py
 import inspect
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+import typing
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from google import genai
 from google.genai import types
 
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
+from src.component_watcher import ComponentWatcher
+from src.event_log import event_context, timed_event
 from src.manager import ComponentManager
 from src.gemini_chat_agent import GeminiChatAgent
-from src.logger import log_message
+from src.logger import flush_logs, log_message
+from src.metrics import argument_bytes, get_metrics_registry, result_bytes
+from src.process_pool import ComponentProcessPool
+from src.rate_limiter import RateLimiter
+from src.tracing import span, traced
 
 
 class AIComponentManager:
@@ -26,40 +36,122 @@ class AIComponentManager:
         model_name: str = "gemini-1.5-flash-latest",
         api_key: Optional[str] = None,
         system_prompt: Optional[str] = None,
+        incremental_reload: bool = True,
+        watch_components: bool = True,
+        lazy_components: bool = False,
+        idle_timeout_turns: Optional[int] = None,
+        use_process_pool: bool = False,
+        process_pool_size: int = 2,
+        tool_timeout: float = 60.0,
+        max_tool_result_bytes: int = 1_000_000,
+        component_manager: Optional[ComponentManager] = None,
+        gemini_client: Optional[genai.Client] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cassette_path: Optional[str] = None,
+        cassette_mode: Optional[str] = None,
+        session_id: Optional[str] = None,
     ):
         self.components_dir = components_dir
-        # Initialize ComponentManager here; its refresh_components will handle initial load
-        self.component_manager = ComponentManager(self.components_dir)
+        # Tags this session's events in the event log
+        self.session_id = session_id or uuid.uuid4().hex[:8]
+        # A component manager passed in is shared with other sessions and reloaded by its owner.
+        self._owns_component_manager = component_manager is None
+        if component_manager is None:
+            # Initialize ComponentManager here; its refresh_components will handle initial load.
+            # Incremental reload keeps unchanged components (and their warm state) across turns.
+            component_manager = ComponentManager(
+                self.components_dir, incremental_reload=incremental_reload
+            )
+        self.component_manager = component_manager
         self.model_name = model_name
 
+        # In lazy mode components are instantiated on their first tool call, and
+        # (optionally) destroyed again after `idle_timeout_turns` turns without use.
+        self.lazy_components = lazy_components
+        self.idle_timeout_turns = idle_timeout_turns
+        self._turn_count = 0
+        self._last_used_turn: Dict[str, int] = {}
+
+        # On a shared component manager only the classes are shared; each session keeps
+        # its own instances, so sessions never see each other's component state.
+        self._session_components: Dict[str, BaseComponent] = {}
+        self._session_components_lock = threading.Lock()
+
+        # Optionally run components in worker processes instead of the agent's own thread.
+        # The host then only needs component classes, to build tool declarations.
+        self.process_pool: Optional[ComponentProcessPool] = None
+        if use_process_pool:
+            self.process_pool = ComponentProcessPool(
+                self.components_dir,
+                size=process_pool_size,
+                call_timeout=tool_timeout,
+                max_result_bytes=max_tool_result_bytes,
+            )
+
         self.available_tools: List[types.Tool] = [] # Will be built after components are loaded
 
+        # (component name, source hash of its module) -> previously built tool
+        self._tool_declaration_cache: Dict[Tuple[str, Any], types.Tool] = {}
+        self.tool_cache_hits = 0
+        self.tool_cache_misses = 0
+
+        # With a watcher, components are reloaded in the background as files change
+        # instead of before every turn.
+        self.component_watcher: Optional[ComponentWatcher] = None
+        if watch_components:
+            self.component_watcher = ComponentWatcher(
+                self.components_dir, self._reload_components_and_tools
+            )
+
         self.gemini_agent = GeminiChatAgent(
             model_name=self.model_name,
             api_key=api_key,
             initial_system_prompt=system_prompt,
+            rate_limiter=rate_limiter,
+            client=gemini_client,
+            cassette_path=cassette_path,
+            cassette_mode=cassette_mode,
         )
         self.gemini_agent.set_tool_executor_callback(self._call_tool)
+        self.gemini_agent.set_parallel_safe_callback(self._is_parallel_safe)
 
         log_message("SYSTEM_INIT", f"AI Component Manager initialized for autonomous operation.")
 
+    @traced()
     def _reload_components_and_tools(self):
         """
         Reloads all components from the components directory and rebuilds
         the list of available Gemini tools.
         """
         log_message("SYSTEM_RELOAD", "Reloading components and rebuilding tools...")
-        # Tell the existing component_manager instance to refresh its components
-        self.component_manager.refresh_components()
-        self.component_manager.load_all_components()
-
-        # Rebuild tools list from the newly loaded components
-        self.available_tools = self._build_gemini_tools()
+        # Waits for in-flight tool calls, so a background reload never swaps code under them
+        with timed_event("reload") as event, self.component_manager.lock.reloading():
+            # Tell the existing component_manager instance to refresh its components
+            changed = self.component_manager.refresh_components()
+            if self.process_pool:
+                self.process_pool.reload()
+            elif not self.lazy_components and self._owns_component_manager:
+                self.component_manager.load_all_components()
+
+            # Rebuild tools list from the newly loaded components
+            self.available_tools = self._build_gemini_tools()
+            event.update(changed=len(changed), tools=len(self.available_tools))
         log_message("SYSTEM_RELOAD", "Components and tools reloaded.")
 
 
     def _get_gemini_type(self, python_type: Any) -> types.Schema:
         """Converts Python types to Gemini's schema types."""
+        if typing.get_origin(python_type) is typing.Union:
+            # Optional[X] -> X
+            arguments = [arg for arg in typing.get_args(python_type) if arg is not type(None)]
+            if len(arguments) == 1:
+                python_type = arguments[0]
+        if python_type is list or typing.get_origin(python_type) is list:
+            item_types = typing.get_args(python_type)
+            return types.Schema(
+                type="array",
+                items=self._get_gemini_type(item_types[0] if item_types else str),
+            )
         if python_type is inspect.Parameter.empty or python_type is str:
             return types.Schema(type="string")
         if python_type is int or python_type is float:
@@ -69,13 +161,14 @@ class AIComponentManager:
         return types.Schema(type="string")
 
     def _component_to_tool_declaration(
-        self, component_name: str, component_instance: BaseComponent
+        self, component_name: str, component_class: Type[BaseComponent]
     ) -> Optional[types.Tool]:
         """
-        Converts a component's 'use' method into a Gemini FunctionDeclaration.
+        Converts a component class's 'use' method into a Gemini FunctionDeclaration.
+        Works from the class so lazy components need not be instantiated.
         """
-        method = getattr(component_instance, "use", None)
-        if not method or not inspect.ismethod(method):
+        method = getattr(component_class, "use", None)
+        if not method or not inspect.isfunction(method):
             log_message("WARNING",
                 f"Component '{component_name}' does not have a usable 'use' method."
             )
@@ -113,20 +206,70 @@ class AIComponentManager:
 
         return types.Tool(function_declarations=[function_declaration])
 
+    def _tool_cache_key(self, name: str, component_class: Type[BaseComponent]) -> Tuple[str, Any]:
+        """
+        Returns the declaration cache key for a component: its name and the
+        source hash of its module, which the component manager already
+        recorded when importing it. Classes from untracked modules are keyed
+        by the class object itself.
+        """
+        source_hash = self.component_manager.module_source_hash(component_class.__module__)
+        return name, source_hash or component_class
+
+    @property
+    def tool_cache_stats(self) -> Dict[str, int]:
+        """
+        Returns tool declaration cache hit/miss counters and the current cache size.
+        """
+        return {
+            "hits": self.tool_cache_hits,
+            "misses": self.tool_cache_misses,
+            "size": len(self._tool_declaration_cache),
+        }
+
+    @traced()
     def _build_gemini_tools(self) -> List[types.Tool]:
         """
-        Builds a list of Gemini tools from all loaded components.
+        Builds a list of Gemini tools from all loaded components, or from all
+        available component classes in lazy or process pool mode and on a
+        shared component manager.
+        Declarations of components whose module is unchanged are reused from
+        the cache instead of being rebuilt.
         """
         tools_list: List[types.Tool] = []
         if not self.component_manager: # Should not happen now that it's initialized in __init__
             log_message("WARNING", "ComponentManager not yet initialized. Cannot build tools.")
             return []
 
-        for name, component in self.component_manager.loaded_components.items():
-            tool_declaration = self._component_to_tool_declaration(name, component)
+        hits = misses = 0
+        used_cache: Dict[Tuple[str, Any], types.Tool] = {}
+        if self.lazy_components or self.process_pool or not self._owns_component_manager:
+            component_classes = dict(self.component_manager.available_component_classes)
+        else:
+            component_classes = {
+                name: type(component)
+                for name, component in self.component_manager.loaded_components.items()
+            }
+
+        for name, component_class in component_classes.items():
+            cache_key = self._tool_cache_key(name, component_class)
+            tool_declaration = self._tool_declaration_cache.get(cache_key)
             if tool_declaration:
+                hits += 1
+            else:
+                misses += 1
+                tool_declaration = self._component_to_tool_declaration(name, component_class)
+            if tool_declaration:
+                used_cache[cache_key] = tool_declaration
                 tools_list.append(tool_declaration)
-        log_message("SYSTEM_TOOL_BUILD", f"Built {len(tools_list)} tools for Gemini.")
+
+        # Only keep declarations for components that still exist
+        self._tool_declaration_cache = used_cache
+        self.tool_cache_hits += hits
+        self.tool_cache_misses += misses
+        log_message("SYSTEM_TOOL_BUILD",
+            f"Built {len(tools_list)} tools for Gemini ({hits} cached, {misses} rebuilt)."
+        )
         for tool_spec in tools_list:
             for fd in tool_spec.function_declarations:
                 log_message("SYSTEM_TOOL_BUILD",
@@ -134,6 +277,13 @@ class AIComponentManager:
                 )
         return tools_list
 
+    def _is_parallel_safe(self, tool_name: str) -> bool:
+        """
+        Returns whether the component behind a tool declares its calls safe to run concurrently.
+        """
+        component_class = self.component_manager.available_component_classes.get(tool_name)
+        return bool(component_class and component_class.parallel_safe)
+
     def _call_tool(self, function_call: types.FunctionCall) -> Any:
         """
         Calls the appropriate component's 'use' method based on Gemini's function call.
@@ -144,18 +294,195 @@ class AIComponentManager:
 
         log_message("AI_ACTION", f"Executing {tool_name} with args: {tool_args}")
 
-        component = self.component_manager.get_component(tool_name)
-        if not component:
-            return f"Error: Component '{tool_name}' not found."
+        bytes_in = argument_bytes(tool_args)
+        with span("AIComponentManager._call_tool", component=tool_name), timed_event(
+            "tool_call", component=tool_name, bytes_in=bytes_in
+        ) as event:
+            start = time.perf_counter()
+            result, ok = self._dispatch_tool(tool_name, tool_args)
+            duration = time.perf_counter() - start
+            bytes_out = result_bytes(result)
+            event.update(bytes=bytes_out, ok=ok)
+        if tool_name in self.component_manager.available_component_classes:
+            # Unknown tool names are not components; keep them out of the registry
+            get_metrics_registry().record(tool_name, duration, ok=ok, bytes_in=bytes_in, bytes_out=bytes_out)
+        return result
+
+    def _dispatch_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Tuple[Any, bool]:
+        """
+        Runs a tool in the process pool or in this process and returns its
+        result and whether it succeeded. Errors are returned as messages;
+        components report failures by returning a ToolError.
+        """
+        with self.component_manager.lock.using():
+            component_class = self.component_manager.available_component_classes.get(tool_name)
+            if self.process_pool and not (component_class and component_class.host_only):
+                if not component_class:
+                    return f"Error: Component '{tool_name}' not found.", False
+                result = self.process_pool.call(tool_name, tool_args)
+                log_message("AI_TOOL_RESULT", f"Tool '{tool_name}' returned: {result}")
+                return result, not isinstance(result, ToolError)
+
+            component = self._get_or_load_component(tool_name)
+            if not component:
+                return f"Error: Component '{tool_name}' not found.", False
+            self._last_used_turn[tool_name] = self._turn_count
+
+            try:
+                result = component.use(**tool_args)
+                log_message("AI_TOOL_RESULT", f"Tool '{tool_name}' returned: {result}")
+                return result, not isinstance(result, ToolError)
+            except Exception as e:
+                error_message = f"Error executing tool '{tool_name}': {e}"
+                log_message("AI_UNEXPECTED_ERROR", error_message)
+                return error_message, False
+
+    @property
+    def loaded_components(self) -> Dict[str, BaseComponent]:
+        """
+        Returns the component instances this session calls.
+        """
+        if self._owns_component_manager:
+            return self.component_manager.loaded_components
+        return self._session_components
+
+    def _get_or_load_component(self, name: str) -> Optional[BaseComponent]:
+        """
+        Returns this session's instance of a component, instantiating it on
+        first use (lazy or process pool mode, or after idle eviction). On a
+        shared component manager, an instance whose class was reloaded is
+        replaced by one of the new class.
+        """
+        component_class = self.component_manager.available_component_classes.get(name)
+        if self._owns_component_manager:
+            component = self.component_manager.get_component(name)
+            if not component and component_class:
+                component = self.component_manager.load_component(name)
+            return component
+
+        with self._session_components_lock:
+            component = self._session_components.get(name)
+            if component is not None and type(component) is component_class:
+                return component
+            if component is not None:
+                self._unload_component(name)
+            if component_class is None:
+                return None
+            try:
+                component = component_class(name)
+                component.onload()
+            except Exception as e:
+                log_message("AI_UNEXPECTED_ERROR", f"Error loading component '{name}': {e}")
+                return None
+            self._session_components[name] = component
+            log_message("SYSTEM_RELOAD", f"Component '{name}' loaded for session '{self.session_id}'.")
+            return component
+
+    def _unload_component(self, name: str):
+        """
+        Destroys this session's instance of a component.
+        """
+        if self._owns_component_manager:
+            self.component_manager.unload_component(name)
+            return
+        component = self._session_components.pop(name, None)
+        if component:
+            try:
+                component.destroy()
+            except Exception as e:
+                log_message("AI_UNEXPECTED_ERROR", f"Error destroying component '{name}': {e}")
+
+    def _sync_session_components(self):
+        """
+        On a shared component manager, drops instances whose class was
+        reloaded or removed and, unless components are lazy, instantiates
+        the missing ones.
+        """
+        if self._owns_component_manager:
+            return
+        with self.component_manager.lock.using():
+            component_classes = self.component_manager.available_component_classes
+            for name, component in list(self._session_components.items()):
+                if component_classes.get(name) is not type(component):
+                    self._unload_component(name)
+            if not self.lazy_components and not self.process_pool:
+                for name in list(component_classes):
+                    self._get_or_load_component(name)
+
+    def _evict_idle_components(self):
+        """
+        Destroys lazily loaded components that have not been used for
+        `idle_timeout_turns` turns. They are re-instantiated on their next call.
+        """
+        if not self.lazy_components or not self.idle_timeout_turns:
+            return
+
+        idle_components = [
+            name for name in self.loaded_components
+            # Runs at the start of a turn, so a component used in the previous turn is 1 turn old
+            if self._turn_count - self._last_used_turn.get(name, self._turn_count) > self.idle_timeout_turns
+        ]
+        if not idle_components:
+            return
+
+        with self.component_manager.lock.reloading():
+            for name in idle_components:
+                log_message("SYSTEM_RELOAD",
+                    f"Unloading idle component '{name}' (unused for {self.idle_timeout_turns} turns)."
+                )
+                self._unload_component(name)
+                self._last_used_turn.pop(name, None)
+
+    def _begin_turn(self):
+        """
+        Advances the turn counter and evicts idle lazy components.
+        """
+        self._turn_count += 1
+        self._evict_idle_components()
+
+    def start(self):
+        """
+        Loads components, builds the tools and starts the watcher and process pool.
+        """
+        if self._owns_component_manager:
+            with event_context(session_id=self.session_id):
+                self._reload_components_and_tools()
+        if self.component_watcher:
+            self.component_watcher.start()
+        if self.process_pool:
+            self.process_pool.start()
+
+    def shutdown(self):
+        """
+        Stops the watcher and process pool, and destroys this session's own
+        component instances.
+        """
+        if self.component_watcher:
+            self.component_watcher.stop()
+        if self.process_pool:
+            self.process_pool.shutdown()
+        if not self._owns_component_manager:
+            for name in list(self._session_components):
+                self._unload_component(name)
+
+    def run_turn(self, user_input: str = ""):
+        """
+        Runs one autonomous turn, with `user_input` as guidance if given.
+        """
+        turn_id = self._turn_count + 1
+        with event_context(session_id=self.session_id, turn_id=turn_id), \
+             span("turn", session_id=self.session_id, turn_id=turn_id), timed_event("turn"):
+            if self._owns_component_manager and not self.component_watcher:
+                # Without a watcher, reload BEFORE each AI turn to reflect any changes made by CodeWriterComponent
+                self._reload_components_and_tools()
+            self._sync_session_components()
+            self._begin_turn()
 
-        try:
-            result = component.use(**tool_args)
-            log_message("AI_TOOL_RESULT", f"Tool '{tool_name}' returned: {result}")
-            return result
-        except Exception as e:
-            error_message = f"Error executing tool '{tool_name}': {e}"
-            log_message("AI_UNEXPECTED_ERROR", error_message)
-            return error_message
+            # Pass the interrupt message (or internal prompt) and the LATEST tools list
+            self.gemini_agent.continue_autonomously(
+                tools=self.available_tools, # Pass the newly built tools
+                interrupt_message= f"Some hidden voice says: {user_input}" if user_input else "proceed"
+            )
 
     def start_autonomous_loop(self):
         """
@@ -168,20 +495,16 @@ class AIComponentManager:
         log_message("SYSTEM_INIT", "Type 'exit' or 'quit' to end the session.")
 
         # Perform initial component load and tool building
-        self._reload_components_and_tools()
+        self.start()
 
         while True:
+            # With background logging, let the turn's output finish before prompting
+            flush_logs()
             user_input = input("\n[User (Press Enter to continue, or type a message)]:\n> ")
 
             if user_input.lower() in ["exit", "quit"]:
                 log_message("SYSTEM_EXIT", "Exiting autonomous loop. Goodbye!")
+                self.shutdown()
                 break
-            
-            # BEFORE each AI turn, reload components to reflect any changes made by CodeWriterComponent
-            self._reload_components_and_tools()
 
-            # Pass the interrupt message (or internal prompt) and the LATEST tools list
-            self.gemini_agent.continue_autonomously(
-                tools=self.available_tools, # Pass the newly built tools
-                interrupt_message= f"Some hidden voice says: {user_input}" if user_input else "proceed"
-            )
\ No newline at end of file
+            self.run_turn(user_input)
\ No newline at end of file
@@ -0,0 +1,225 @@
+# src/async_gemini_chat_agent.py
+import asyncio
+import inspect
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+from google.genai import errors, types
+
+from src.event_log import timed_event
+from src.gemini_chat_agent import GeminiChatAgent
+from src.logger import log_message
+from src.result_store import using_result_store
+from src.tracing import span
+
+
+class AsyncGeminiChatAgent(GeminiChatAgent):
+    """
+    Asyncio version of GeminiChatAgent built on the `client.aio` API.
+
+    Requests, tool execution and rate limit waits never block the event loop,
+    so one process can drive many agent sessions concurrently without a
+    thread per session. History handling, compaction, result offloading and
+    the shared rate limiter are the same as in the synchronous agent.
+
+    The tool executor callback may be a coroutine function; a plain function
+    is run in a worker thread. Model text can be consumed as it streams,
+    through the text callback (which may also be a coroutine function) or by
+    iterating over `stream_autonomously`.
+    """
+
+    async def _emit_text_async(self, text: str):
+        """
+        Logs a chunk of model text and passes it to the (sync or async) text callback.
+        """
+        log_message("AI_THOUGHT", text, end="")
+        if self._text_callback:
+            try:
+                result = self._text_callback(text)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                log_message("WARNING", f"Text callback failed: {e}")
+
+    async def stream_autonomously(
+        self, tools: List[types.Tool], interrupt_message: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Runs one turn like `continue_autonomously` and yields the model's text
+        chunks as they arrive.
+        """
+        chunks: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        previous_callback = self._text_callback
+
+        async def forward(text: str):
+            await chunks.put(text)
+            if previous_callback:
+                result = previous_callback(text)
+                if inspect.isawaitable(result):
+                    await result
+
+        self._text_callback = forward
+        turn = asyncio.create_task(self.continue_autonomously(tools, interrupt_message))
+        turn.add_done_callback(lambda _: chunks.put_nowait(None))
+        try:
+            while True:
+                text = await chunks.get()
+                if text is None:
+                    break
+                yield text
+            await turn
+        finally:
+            self._text_callback = previous_callback
+            if not turn.done():
+                turn.cancel()
+
+    def set_tool_executor_callback(
+        self, callback: Callable[[types.FunctionCall], Union[Any, Awaitable[Any]]]
+    ):
+        """
+        Sets the (sync or async) callback the agent will use to execute tools.
+        """
+        self._tool_executor_callback = callback
+
+    async def _execute_tool_async(self, function_call: types.FunctionCall, semaphore: asyncio.Semaphore) -> Any:
+        """
+        Executes a single function call through the tool executor callback.
+        """
+        if not self._tool_executor_callback:
+            error_message = f"Error: Tool executor callback not set for {function_call.name}."
+            log_message("AI_UNEXPECTED_ERROR", error_message)
+            return error_message
+        async with semaphore:
+            try:
+                # ToolResultReader reads the handles of this agent's store (to_thread copies the context)
+                with using_result_store(self.result_store):
+                    if inspect.iscoroutinefunction(self._tool_executor_callback):
+                        return await self._tool_executor_callback(function_call)
+                    return await asyncio.to_thread(self._tool_executor_callback, function_call)
+            except Exception as e:
+                error_message = f"Error executing tool '{function_call.name}': {e}"
+                log_message("AI_UNEXPECTED_ERROR", error_message)
+                return error_message
+
+    async def _execute_call_group_async(
+        self, function_calls: List[types.FunctionCall], group: List[int], semaphore: asyncio.Semaphore
+    ) -> List[Any]:
+        """
+        Executes the calls of one group in order.
+        """
+        return [await self._execute_tool_async(function_calls[index], semaphore) for index in group]
+
+    async def _execute_function_calls_async(
+        self,
+        function_calls: List[types.FunctionCall],
+        preceding_parts: Optional[List[types.Part]] = None,
+    ):
+        """
+        Executes all function calls from one model response and records them in
+        the chat history. Calls to parallel-safe tools run concurrently (up to
+        `max_parallel_tool_calls` at once) with each other and with the
+        remaining calls, which run one at a time in order.
+        """
+        for fc_item in function_calls:
+            log_message("AI_ACTION", f"Calling tool: {fc_item.name}({fc_item.args})")
+
+        groups = self._group_function_calls(function_calls)
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_tool_calls))
+        group_results = await asyncio.gather(
+            *(self._execute_call_group_async(function_calls, group, semaphore) for group in groups)
+        )
+        results: List[Any] = [None] * len(function_calls)
+        for group, group_result in zip(groups, group_results):
+            for index, result in zip(group, group_result):
+                results[index] = result
+        self._record_function_calls(function_calls, results, preceding_parts)
+
+    async def _apply_rate_limit_async(self) -> int:
+        """
+        Waits, without blocking the event loop, until the rate limiter allows
+        a request carrying the current chat history. Returns the token estimate.
+        """
+        with span("AsyncGeminiChatAgent._apply_rate_limit_async"):
+            estimated_tokens = self.estimate_request_tokens()
+            await self.rate_limiter.acquire_async(estimated_tokens)
+            return estimated_tokens
+
+    async def continue_autonomously(self, tools: List[types.Tool], interrupt_message: Optional[str] = None) -> None:
+        """
+        Causes the Gemini model to continue its internal thought process or action.
+        Allows for an optional interrupt message from the user.
+
+        Same tool call loop and limits as GeminiChatAgent.continue_autonomously.
+        """
+        effective_user_message = self._start_turn(interrupt_message)
+
+        generate_content_config = types.GenerateContentConfig(
+            tools=tools,
+            response_mime_type="text/plain",
+        )
+
+        try:
+            requests_sent = 0
+            tool_depth = 0
+            response_text: List[str] = []
+
+            while True:
+                self.history_manager.compact(self.chat_history, pinned=self._pinned_messages)
+                estimated_tokens = await self._apply_rate_limit_async()
+                function_calls: List[types.FunctionCall] = []
+                usage = None
+                with span("generate_content_stream", model=self.model_name) as request_span, timed_event(
+                    "api_request", model=self.model_name, bytes=self.history_manager.last_bytes_after
+                ) as event:
+                    stream = await self.gemini_client.aio.models.generate_content_stream(
+                        model=self.model_name,
+                        contents=self.chat_history,
+                        config=generate_content_config,
+                    )
+                    requests_sent += 1
+
+                    async for chunk in stream:
+                        if chunk.usage_metadata:
+                            usage = chunk.usage_metadata
+                        if chunk.function_calls:
+                            function_calls.extend(chunk.function_calls)
+                        elif chunk.text:
+                            await self._emit_text_async(chunk.text)
+                            response_text.append(chunk.text)
+                    event.update(
+                        function_calls=len(function_calls),
+                        response_bytes=sum(len(text.encode("utf-8")) for text in response_text),
+                        tokens=self._record_usage(usage, estimated_tokens),
+                    )
+                    request_span.set_attribute("function_calls", len(function_calls))
+
+                log_message("AI_THOUGHT", "", end="\n") # Ensure newline after stream
+
+                if not function_calls:
+                    break
+
+                if tool_depth:
+                    log_message("AI_ACTION", "Chained tool call detected.", symbol="⛓️ ")
+                await self._execute_function_calls_async(function_calls, preceding_parts=self._text_parts(response_text))
+                response_text = []
+                tool_depth += 1
+
+                if tool_depth >= self.max_tool_depth or requests_sent >= self.max_requests_per_turn:
+                    log_message("WARNING",
+                        f"Stopping tool chain after {tool_depth} rounds and {requests_sent} requests; "
+                        "the latest tool results will be sent with the next turn."
+                    )
+                    break
+
+            if response_text:
+                self.chat_history.append(
+                    types.Content(role="model", parts=self._text_parts(response_text))
+                )
+
+        except errors.ClientError as e:
+            log_message("AI_API_ERROR", f"ClientError: {e}")
+            self._discard_turn_message(effective_user_message)
+            await asyncio.sleep(5)
+        except Exception as e:
+            log_message("AI_UNEXPECTED_ERROR", f"Unexpected Error: {e}")
+            log_message("AI_UNEXPECTED_ERROR", "Please try again or type an interrupt message.")
+            self._discard_turn_message(effective_user_message)
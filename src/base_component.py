@@ -2,12 +2,28 @@
 import abc
 
 
+class ToolError(str):
+    """
+    A component result that reports a failure. The model sees it as the
+    plain message; the manager counts the call as failed.
+    """
+
+
 class BaseComponent(abc.ABC):
     """
     Abstract base class for all components.
     Defines the required methods for a component.
     """
 
+    # Components that depend on the host process' state set this so they are
+    # never moved into a worker process.
+    host_only = False
+
+    # Components whose `use` is thread-safe and neither affects nor depends on
+    # other tool calls set this, so several of their calls from one model
+    # response may run concurrently. All other calls run one at a time, in order.
+    parallel_safe = False
+
     def __init__(self, name: str):
         self._name = name
         # print(f"Component '{self.name}' initialized.") # Commented for less noise
@@ -0,0 +1,89 @@
+# src/bytecode_cache.py
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import threading
+import types
+from typing import Optional
+
+from src.logger import log_message
+
+
+class BytecodeCache:
+    """
+    On-disk cache of compiled component code objects.
+
+    Each component module has one entry per Python version, tagged with a
+    digest of its file path and source hash. An entry is only used when the
+    digest and the interpreter's bytecode magic number both match, so edits
+    are picked up even when they land within the filesystem's mtime
+    granularity.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _entry_path(self, module_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{module_name}.{sys.implementation.cache_tag}.bin")
+
+    @staticmethod
+    def _entry_key(file_path: str, source_hash: str) -> bytes:
+        return hashlib.sha256(f"{os.path.abspath(file_path)}\0{source_hash}".encode("utf-8")).digest()
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def load(self, module_name: str, file_path: str, source_hash: str) -> Optional[types.CodeType]:
+        """
+        Returns the cached code object for a module, or None if there is no
+        valid entry for this source and Python version.
+        """
+        header = importlib.util.MAGIC_NUMBER + self._entry_key(file_path, source_hash)
+        try:
+            with open(self._entry_path(module_name), "rb") as f:
+                data = f.read()
+        except OSError:
+            self._count(hit=False)
+            return None
+
+        if not data.startswith(header):
+            self._count(hit=False)
+            return None
+
+        try:
+            code = marshal.loads(data[len(header):])
+        except (EOFError, ValueError, TypeError):
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return code
+
+    def store(self, module_name: str, file_path: str, source_hash: str, code: types.CodeType):
+        """
+        Writes a module's code object to the cache, replacing any older entry.
+        """
+        entry_path = self._entry_path(module_name)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(importlib.util.MAGIC_NUMBER)
+                f.write(self._entry_key(file_path, source_hash))
+                f.write(marshal.dumps(code))
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            log_message("WARNING", f"Could not write bytecode cache for {module_name}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
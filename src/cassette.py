@@ -0,0 +1,186 @@
+# src/cassette.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.fake_gemini import Chunk, chunk_to_response, response_to_chunk
+from src.logger import log_message
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """
+    Raised in replay mode for a request the cassette has no response for.
+    """
+
+
+def _canonical(value: Any) -> Any:
+    """
+    Converts SDK objects to plain JSON data for hashing.
+    """
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return _canonical(model_dump(mode="json", exclude_none=True))
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "__dict__"):
+        return _canonical(vars(value))
+    return repr(value)
+
+
+def request_key(model: str, contents: Any, config: Any) -> str:
+    """
+    Returns the hash identifying a request: model, contents and config.
+    """
+    payload = json.dumps(
+        {"model": model, "contents": _canonical(contents), "config": _canonical(config)},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Gzipped JSON-lines file of model requests (by hash) and their streamed
+    response chunks.
+
+    Opening a cassette in record mode empties the file, then every response
+    is appended as it completes. In replay mode requests are answered from
+    the file: by hash, in recorded order for repeated identical requests. Unless `strict` is set, a request with no
+    match gets the next recorded response in sequence, so a session whose
+    tool results vary slightly between runs still replays.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", strict: bool = False):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Cassette mode must be one of {CASSETTE_MODES}, not '{mode}'.")
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._used = set()
+        self._position = 0
+        self.hits = 0
+        self.misses = 0
+
+        if mode == "replay":
+            self._load()
+        else:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Start a fresh recording; appending would leave the previous session's responses in front
+            open(path, "wb").close()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._by_key.setdefault(entry["key"], []).append(len(self._entries))
+                    self._entries.append(entry)
+        log_message("SYSTEM_INIT", f"Replaying {len(self._entries)} recorded responses from {self.path}.")
+
+    def record(self, key: str, chunks: List[Chunk]):
+        """
+        Appends a request's response chunks to the cassette file.
+        """
+        line = json.dumps({"key": key, "chunks": chunks}, separators=(",", ":")) + "\n"
+        with self._lock:
+            # Each append adds a gzip member; gzip.open reads them back as one stream
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+
+    def replay(self, key: str) -> List[Chunk]:
+        """
+        Returns the recorded chunks for a request.
+        """
+        with self._lock:
+            index = next((i for i in self._by_key.get(key, []) if i not in self._used), None)
+            if index is not None:
+                self.hits += 1
+            elif not self.strict and self._position < len(self._entries):
+                index = self._position
+                self.misses += 1
+                log_message("WARNING", f"No recorded response matches request {key[:12]}; replaying the next one in order.")
+            else:
+                raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.path}.")
+            self._used.add(index)
+            self._position = max(self._position, index + 1)
+            return self._entries[index]["chunks"]
+
+
+class _CassetteModels:
+    def __init__(self, cassette: Cassette, models: Any):
+        self._cassette = cassette
+        self._models = models
+
+    def generate_content_stream(self, model: str, contents: Any, config: Any = None):
+        key = request_key(model, contents, config)
+        if self._cassette.mode == "replay":
+            for chunk in self._cassette.replay(key):
+                yield chunk_to_response(chunk)
+            return
+
+        chunks = []
+        for response in self._models.generate_content_stream(model=model, contents=contents, config=config):
+            chunks.append(response_to_chunk(response))
+            yield response
+        self._cassette.record(key, chunks)
+
+
+class _CassetteAsyncModels:
+    def __init__(self, cassette: Cassette, models: Any):
+        self._cassette = cassette
+        self._models = models
+
+    async def generate_content_stream(self, model: str, contents: Any, config: Any = None):
+        cassette = self._cassette
+        key = request_key(model, contents, config)
+        if cassette.mode == "replay":
+            chunks = cassette.replay(key)
+
+            async def replayed():
+                for chunk in chunks:
+                    yield chunk_to_response(chunk)
+
+            return replayed()
+
+        stream = await self._models.generate_content_stream(model=model, contents=contents, config=config)
+
+        async def recorded():
+            chunks = []
+            async for response in stream:
+                chunks.append(response_to_chunk(response))
+                yield response
+            cassette.record(key, chunks)
+
+        return recorded()
+
+
+class _CassetteAio:
+    def __init__(self, cassette: Cassette, client: Optional[Any]):
+        self.models = _CassetteAsyncModels(cassette, client.aio.models if client else None)
+
+
+class CassetteClient:
+    """
+    Wraps a Gemini client so streamed requests are recorded to, or replayed
+    from, a cassette. Replay needs no inner client and makes no network calls.
+    """
+
+    def __init__(self, cassette: Cassette, client: Optional[Any] = None):
+        if cassette.mode == "record" and client is None:
+            raise ValueError("Recording needs a Gemini client to forward requests to.")
+        self.cassette = cassette
+        self.models = _CassetteModels(cassette, client.models if client else None)
+        self.aio = _CassetteAio(cassette, client)
@@ -0,0 +1,171 @@
+# src/component_watcher.py
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from src.logger import log_message
+
+# inotify(7) constants, see <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_IGNORED = 0x00008000
+_IN_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE | _IN_DELETE_SELF
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class ComponentWatcher:
+    """
+    Watches a components directory on a background thread and calls
+    `on_change` whenever a component file is written, added, renamed or removed.
+
+    Uses inotify when the platform provides it and falls back to periodically
+    diffing `os.scandir` stat results otherwise.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_change: Callable[[], None],
+        poll_interval: float = 1.0,
+        debounce: float = 0.2,
+    ):
+        self.directory = directory
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.backend: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify_fd: Optional[int] = None
+
+    def start(self):
+        """
+        Starts watching. Does nothing if the watcher is already running.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._inotify_fd = self._open_inotify()
+        if self._inotify_fd is not None:
+            self.backend = "inotify"
+            target = self._run_inotify
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+
+        self._thread = threading.Thread(target=target, name="ComponentWatcher", daemon=True)
+        self._thread.start()
+        log_message("SYSTEM_RELOAD", f"Watching '{self.directory}' for component changes ({self.backend}).")
+
+    def stop(self):
+        """
+        Stops watching and waits for the background thread to exit.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=max(self.poll_interval, 1.0) * 2)
+            self._thread = None
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _notify(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            log_message("AI_UNEXPECTED_ERROR", f"Error handling component change: {e}")
+
+    def _open_inotify(self) -> Optional[int]:
+        """
+        Returns an inotify file descriptor watching `directory`, or None if
+        inotify is unavailable.
+        """
+        if not hasattr(os, "O_NONBLOCK") or not os.path.isdir(self.directory):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+
+        fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if inotify_add_watch(fd, os.fsencode(self.directory), _IN_WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _read_inotify_events(self, fd: int) -> Tuple[bool, bool]:
+        """
+        Drains pending inotify events.
+        Returns (component file changed, watch was removed).
+        """
+        changed = False
+        watch_removed = False
+        while True:
+            try:
+                buffer = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(buffer):
+                _, mask, _, name_length = _INOTIFY_EVENT.unpack_from(buffer, offset)
+                offset += _INOTIFY_EVENT.size
+                name = buffer[offset:offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if mask & (_IN_DELETE_SELF | _IN_IGNORED):
+                    watch_removed = True
+                elif name.endswith(b".py"):
+                    changed = True
+        return changed, watch_removed
+
+    def _run_inotify(self):
+        fd = self._inotify_fd
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([fd], [], [], self.poll_interval)
+            if not readable:
+                continue
+            changed, watch_removed = self._read_inotify_events(fd)
+            if changed:
+                # Let bursts of writes (editors, multi-file edits) settle into one reload.
+                while select.select([fd], [], [], self.debounce)[0]:
+                    more_changed, more_removed = self._read_inotify_events(fd)
+                    watch_removed = watch_removed or more_removed
+                self._notify()
+            if watch_removed:
+                log_message("WARNING", f"Lost inotify watch on '{self.directory}'. Falling back to polling.")
+                self.backend = "polling"
+                self._run_polling()
+                return
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".py") and entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return snapshot
+
+    def _run_polling(self):
+        previous = self._snapshot()
+        while not self._stop_event.wait(self.poll_interval):
+            current = self._snapshot()
+            if current != previous:
+                previous = current
+                self._notify()
@@ -1,7 +1,7 @@
 # src/components/code_writer_component.py
 import os
 
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
 
 
 class CodeWriterComponent(BaseComponent):
@@ -51,22 +51,22 @@ class CodeWriterComponent(BaseComponent):
       
         """
         if not file_name.endswith(".py"):
-            return f"Error: File name '{file_name}' must end with '.py'."
+            return ToolError(f"Error: File name '{file_name}' must end with '.py'.")
 
         file_path = os.path.join(self.target_component_dir, file_name)
 
         if os.path.exists(file_path):
-            return f"Error: File '{file_name}' already exists. Please choose a different name or modify existing file manually."
+            return ToolError(f"Error: File '{file_name}' already exists. Please choose a different name or modify existing file manually.")
 
         try:
             with open(file_path, "w") as f:
                 f.write(code_content)
             print(f"Successfully wrote new component to: {file_path}")
-            return f"Success: Component '{file_name}' created. It will be loaded on manager restart."
+            return f"Success: Component '{file_name}' created. It will be loaded automatically."
         except Exception as e:
             error_msg = f"Error writing component '{file_name}': {e}"
             print(error_msg)
-            return (
+            return ToolError(
                 f"Error: Failed to create component '{file_name}'. Details: {error_msg}"
             )
 
@@ -0,0 +1,44 @@
+from src.base_component import BaseComponent, ToolError
+from src.metrics import get_metrics_registry
+
+
+class ComponentMetrics(BaseComponent):
+    """Reports call counts, errors, latency and data volume per component."""
+
+    # Reads the host process' metrics registry, so it must not run in a worker process
+    host_only = True
+
+    def __init__(self, name: str):
+        super().__init__(name)
+
+    def onload(self):
+        print(f"ComponentMetrics '{self.name}' is now active!")
+
+    def use(self, component_name: str = "", sort_by: str = "p95_ms") -> str:
+        """
+        Shows how each component (tool) has performed so far: number of calls and errors,
+        p50/p95/p99 latency in milliseconds, bytes of arguments and results, and when it was last used.
+        Useful for finding slow, failing or unused tools worth improving or removing.
+
+        Args:
+            component_name: Only report this component. Leave empty to report all of them.
+            sort_by: Column to sort by, highest first: "calls", "errors", "p50_ms", "p95_ms", "p99_ms",
+                "bytes_in", "bytes_out" or "last_used".
+
+        Returns:
+            A table of the metrics, or an error message if the component has never been called.
+        """
+        registry = get_metrics_registry()
+        if not component_name:
+            return registry.format_table(sort_by)
+
+        stats = registry.get(component_name)
+        if stats is None:
+            return ToolError(f"Error: No calls recorded for component '{component_name}'.")
+        return "\n".join(
+            f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}"
+            for key, value in stats.items()
+        )
+
+    def destroy(self):
+        print(f"ComponentMetrics '{self.name}' is shutting down.")
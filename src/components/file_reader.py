@@ -1,5 +1,5 @@
 import os
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
 
 class FileReader(BaseComponent):
     """Reads the content of a specified file."""
@@ -26,10 +26,10 @@ class FileReader(BaseComponent):
                 return content
         except FileNotFoundError:
             print(f"Error: File '{file_path}' not found.")
-            return f"Error: File '{file_path}' not found."
+            return ToolError(f"Error: File '{file_path}' not found.")
         except OSError as e:
             print(f"Error accessing '{file_path}': {e}")
-            return f"Error accessing '{file_path}': {e}"
+            return ToolError(f"Error accessing '{file_path}': {e}")
 
     def destroy(self):
         print(f"FileReader '{self.name}' is shutting down.")
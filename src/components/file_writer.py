@@ -1,4 +1,4 @@
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
 
 class FileWriterComponent(BaseComponent):
     """Writes data to a specified file."""
@@ -25,7 +25,7 @@ class FileWriterComponent(BaseComponent):
                 f.write(content)
             return f"Successfully wrote content to '{file_path}'"
         except Exception as e:
-            return f"Error writing to file: {e}"
+            return ToolError(f"Error writing to file: {e}")
 
     def destroy(self):
         print(f"FileWriterComponent '{self.name}' is shutting down.")
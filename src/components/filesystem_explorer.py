@@ -1,5 +1,5 @@
 import os
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
 
 class FileSystemExplorer(BaseComponent):
     """Provides basic file system introspection capabilities."""
@@ -25,7 +25,7 @@ class FileSystemExplorer(BaseComponent):
             print(result)
             return result
         except OSError as e:
-            result = f"Error accessing '{directory_path}': {e}"
+            result = ToolError(f"Error accessing '{directory_path}': {e}")
             print(result)
             return result
 
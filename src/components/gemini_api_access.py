@@ -1,9 +1,15 @@
 # src/components/gemini_api_access.py
+import contextvars
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import requests
-from src.base_component import BaseComponent
-from typing import Dict, Any
+from src.base_component import BaseComponent, ToolError
+from src.event_log import emit_event, timed_event
+from src.http_session import get_http_session, http_timeout
+from src.rate_limiter import get_shared_rate_limiter
+from src.response_cache import get_response_cache
+from typing import Dict, Any, List, Optional
 
 # Ensure .env is loaded (though main.py handles this for the overall app)
 # load_dotenv() # Generally not needed in component files if main script loads it
@@ -12,10 +18,19 @@ class GeminiAPIAccess(BaseComponent):
     """
     Allows interaction with the Gemini API for text generation and other tasks.
     """
+
+    # Stateless requests through the shared, thread-safe session and cache
+    parallel_safe = True
+    # Must use the host's rate limiter and response cache; a worker process would
+    # get its own limiter and let the process as a whole exceed GEMINI_RPM
+    host_only = True
+
     def __init__(self, name: str):
         super().__init__(name)
         self.api_key = os.environ.get("GEMINI_API_KEY")
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent" # Changed to flash model for consistency with AI agent
+        # GEMINI_API_BASE_URL can point this at another endpoint, e.g. a local FakeGeminiServer
+        base_url = os.environ.get("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+        self.api_url = f"{base_url}/v1beta/models/gemini-1.5-flash-latest:generateContent" # Changed to flash model for consistency with AI agent
 
 
     def onload(self):
@@ -23,18 +38,54 @@ class GeminiAPIAccess(BaseComponent):
         print(f"GeminiAPIAccess '{self.name}' is now active!")
 
 
-    def use(self, prompt: str) -> str:
+    def use(self, prompt: str, additional_prompts: Optional[List[str]] = None) -> str:
         """
         Sends a prompt to the Gemini API and returns the response.
+        To ask several independent questions at once, put the first in `prompt`
+        and the rest in `additional_prompts`; they are sent concurrently.
 
         Args:
             prompt: The prompt to send to the Gemini API.
+            additional_prompts: Optional further prompts to send alongside the first.
 
         Returns:
             The Gemini API's response as a string. Returns an error message if the API call fails.
+            With additional prompts, the numbered responses to all prompts in order.
+        """
+        if not additional_prompts:
+            return self._generate(prompt)
+
+        results = self.use_batch([prompt] + list(additional_prompts))
+        combined = "\n\n".join(f"[{i}] {result}" for i, result in enumerate(results, start=1))
+        # The call failed only if every prompt did
+        return ToolError(combined) if all(isinstance(result, ToolError) for result in results) else combined
+
+    def use_batch(self, prompts: List[str], max_concurrency: int = 4) -> List[str]:
+        """
+        Sends several prompts concurrently, at most `max_concurrency` at a time
+        and within the shared rate limiter, and returns the responses in order.
+        A failed prompt gets an error message in its place.
+        """
+        if len(prompts) <= 1 or max_concurrency <= 1:
+            return [self._generate(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(prompts))) as executor:
+            # Copies of this context keep the session and turn ids on each request's events
+            futures = [executor.submit(contextvars.copy_context().run, self._generate, prompt) for prompt in prompts]
+            return [future.result() for future in futures]
+
+    def _generate(self, prompt: str) -> str:
+        """
+        Sends one prompt and returns the response text or an error message.
         """
         if not self.api_key:
-            return "Error: Gemini API key not found. Please set GEMINI_API_KEY environment variable."
+            return ToolError("Error: Gemini API key not found. Please set GEMINI_API_KEY environment variable.")
+
+        # Repeated prompts are answered from the cache without spending quota
+        cache = get_response_cache()
+        cached_response = cache.get(prompt, self.api_url)
+        if cached_response is not None:
+            emit_event("api_request", component=self.name, bytes=len(prompt.encode("utf-8")), cached=True)
+            return cached_response
 
         headers = {
             "Content-Type": "application/json",
@@ -48,8 +99,14 @@ class GeminiAPIAccess(BaseComponent):
         }
         url = f"{self.api_url}?key={self.api_key}"
 
+        # Shares the request and token budgets with the chat agents (rough estimate of 4 characters per token)
+        get_shared_rate_limiter().acquire(len(prompt) // 4 + 1)
+
         try:
-            response = requests.post(url, headers=headers, json=data)
+            # Pooled keep-alive connections, with retries on 429/5xx and a timeout so calls never hang
+            with timed_event("api_request", component=self.name, bytes=len(prompt.encode("utf-8"))) as event:
+                response = get_http_session().post(url, headers=headers, json=data, timeout=http_timeout())
+                event.update(status=response.status_code, response_bytes=len(response.content))
             response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
             response_json = response.json()
 
@@ -58,19 +115,21 @@ class GeminiAPIAccess(BaseComponent):
                 response_json["candidates"][0].get("content") and
                 response_json["candidates"][0]["content"].get("parts") and
                 response_json["candidates"][0]["content"]["parts"][0].get("text")):
-                return response_json["candidates"][0]["content"]["parts"][0]["text"]
+                text = response_json["candidates"][0]["content"]["parts"][0]["text"]
+                cache.put(prompt, text, self.api_url)
+                return text
             elif response_json.get("promptFeedback") and response_json["promptFeedback"].get("blockReason"):
-                return f"Response blocked by safety filters. Reason: {response_json['promptFeedback']['blockReason']}"
+                return ToolError(f"Response blocked by safety filters. Reason: {response_json['promptFeedback']['blockReason']}")
             else:
-                return f"No readable text response from Gemini API. Full response: {response_json}"
+                return ToolError(f"No readable text response from Gemini API. Full response: {response_json}")
             # --- CRITICAL FIX END ---
 
         except requests.exceptions.RequestException as e:
-            return f"Error communicating with Gemini API: {e}"
+            return ToolError(f"Error communicating with Gemini API: {e}")
         except KeyError as e:
-            return f"Unexpected response format from Gemini API (KeyError: {e}). Response: {response_json}"
+            return ToolError(f"Unexpected response format from Gemini API (KeyError: {e}). Response: {response_json}")
         except Exception as e:
-            return f"An unexpected error occurred: {e}"
+            return ToolError(f"An unexpected error occurred: {e}")
 
 
     def destroy(self):
@@ -1,5 +1,5 @@
 from typing import Union
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
 
 
 class KnowledgeBase(BaseComponent):
@@ -30,18 +30,18 @@ class KnowledgeBase(BaseComponent):
                 self.data[key] = value
                 return True
             else:
-                return "Error: 'add' requires both 'key' and 'value'"
+                return ToolError("Error: 'add' requires both 'key' and 'value'")
         elif action == "get":
             if key is not None:
                 return self.data.get(key)
             else:
-                return "Error: 'get' requires a 'key'"
+                return ToolError("Error: 'get' requires a 'key'")
         elif action == "update":
             if key is not None and value is not None:
                 self.data[key] = value
                 return True
             else:
-                return "Error: 'update' requires both 'key' and 'value'"
+                return ToolError("Error: 'update' requires both 'key' and 'value'")
         elif action == "delete":
             if key is not None:
                 if key in self.data:
@@ -50,11 +50,11 @@ class KnowledgeBase(BaseComponent):
                 else:
                     return False
             else:
-                return "Error: 'delete' requires a 'key'"
+                return ToolError("Error: 'delete' requires a 'key'")
         elif action == "list":
             return list(self.data.keys())
         else:
-            return "Error: Invalid action.  Use 'add', 'get', 'update', 'delete', or 'list'."
+            return ToolError("Error: Invalid action.  Use 'add', 'get', 'update', 'delete', or 'list'.")
 
     def destroy(self):
         print(f"KnowledgeBase '{self.name}' is shutting down.")
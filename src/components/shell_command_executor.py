@@ -1,6 +1,6 @@
 
 import subprocess
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
 import shlex
 
 class ShellCommandExecutor(BaseComponent):
@@ -26,11 +26,11 @@ class ShellCommandExecutor(BaseComponent):
             process = subprocess.run(shlex.split(command), capture_output=True, text=True, check=True)
             return process.stdout
         except subprocess.CalledProcessError as e:
-            return f"Error executing command: {e}"
+            return ToolError(f"Error executing command: {e}")
         except FileNotFoundError:
-            return "Error: Command not found."
+            return ToolError("Error: Command not found.")
         except Exception as e:
-            return f"An unexpected error occurred: {e}"
+            return ToolError(f"An unexpected error occurred: {e}")
 
 
     def destroy(self):
@@ -0,0 +1,47 @@
+from src.base_component import BaseComponent, ToolError
+from src.result_store import get_result_store
+
+
+class ToolResultReader(BaseComponent):
+    """Pages through large tool results that were stored outside the chat history."""
+
+    # Reads the host process' result store, so it must not run in a worker process
+    host_only = True
+    # Only reads results stored by earlier responses
+    parallel_safe = True
+
+    def __init__(self, name: str):
+        super().__init__(name)
+
+    def onload(self):
+        print(f"ToolResultReader '{self.name}' is now active!")
+
+    def use(self, handle: str, offset: int = 0, length: int = 4000) -> str:
+        """
+        Reads part of a large tool result that was replaced by a preview in the conversation.
+
+        Args:
+            handle: The handle named in the truncated tool result (e.g. "FileReader-3").
+            offset: The character position to start reading from.
+            length: How many characters to read (at most 20000).
+
+        Returns:
+            The requested slice of the stored result, followed by a note on how to read the next part.
+            Returns an error message if the handle is unknown.
+        """
+        store = get_result_store()
+        offset = max(int(offset), 0)
+        length = min(max(int(length), 1), 20000)
+
+        total = store.size(handle)
+        text = store.read(handle, offset, length)
+        if total is None or text is None:
+            return ToolError(f"Error: No stored result with handle '{handle}'.")
+
+        end = offset + len(text)
+        if end < total:
+            return f"{text}\n[... characters {offset}-{end} of {total}; continue with offset={end}.]"
+        return f"{text}\n[... end of result, characters {offset}-{end} of {total}.]"
+
+    def destroy(self):
+        print(f"ToolResultReader '{self.name}' is shutting down.")
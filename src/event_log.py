@@ -0,0 +1,131 @@
+# src/event_log.py
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+# Identify the session and turn an event belongs to. Context variables follow
+# asyncio tasks, and threads that run a copy of the caller's context.
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
+_turn_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("turn_id", default=None)
+
+
+@contextlib.contextmanager
+def event_context(session_id: Optional[str] = None, turn_id: Optional[int] = None) -> Iterator[None]:
+    """
+    Tags every event emitted inside the block with a session and/or turn id.
+    """
+    tokens = []
+    if session_id is not None:
+        tokens.append((_session_id, _session_id.set(session_id)))
+    if turn_id is not None:
+        tokens.append((_turn_id, _turn_id.set(turn_id)))
+    try:
+        yield
+    finally:
+        for variable, token in reversed(tokens):
+            variable.reset(token)
+
+
+class EventLog:
+    """
+    Appends structured events to a JSON-lines file, one object per line with
+    `ts`, `level`, `event`, `session_id` and `turn_id` plus event fields such
+    as `component`, `duration_ms` and `bytes`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Line buffered, so the file can be tailed while a session runs
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+        self.events_written = 0
+
+    def emit(self, event: str, level: str = "INFO", **fields: Any):
+        record: Dict[str, Any] = {
+            "ts": time.time(),
+            "level": level,
+            "event": event,
+            "session_id": _session_id.get(),
+            "turn_id": _turn_id.get(),
+        }
+        record.update((key, value) for key, value in fields.items() if value is not None)
+        line = json.dumps(record, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self.events_written += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+_event_log: Optional[EventLog] = None
+
+
+def configure_event_log(path: Optional[str]) -> Optional[EventLog]:
+    """
+    Starts writing events to `path` (replacing any previous event log), or stops with None.
+    """
+    global _event_log
+    previous, _event_log = _event_log, EventLog(path) if path else None
+    if previous:
+        previous.close()
+    return _event_log
+
+
+def get_event_log() -> Optional[EventLog]:
+    return _event_log
+
+
+if os.environ.get("EVENT_LOG_PATH"):
+    configure_event_log(os.environ["EVENT_LOG_PATH"])
+
+
+def emit_event(event: str, level: str = "INFO", **fields: Any):
+    """
+    Records an event if an event log is configured; does nothing otherwise.
+    """
+    event_log = _event_log
+    if event_log is not None:
+        event_log.emit(event, level, **fields)
+
+
+class _TimedEvent:
+    """
+    Fields of an event being timed; set more with `update` before the block ends.
+    """
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+
+    def update(self, **fields: Any):
+        self.fields.update(fields)
+
+
+@contextlib.contextmanager
+def timed_event(event: str, **fields: Any) -> Iterator[_TimedEvent]:
+    """
+    Emits `event` with the block's duration in `duration_ms` when the block
+    ends, at level ERROR (with the exception message) if it raised.
+    """
+    if _event_log is None:
+        yield _TimedEvent(fields)
+        return
+
+    timed = _TimedEvent(fields)
+    start = time.perf_counter()
+    try:
+        yield timed
+    except BaseException as e:
+        emit_event(event, "ERROR", duration_ms=(time.perf_counter() - start) * 1000, error=str(e), **timed.fields)
+        raise
+    emit_event(event, duration_ms=(time.perf_counter() - start) * 1000, **timed.fields)
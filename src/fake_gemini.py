@@ -0,0 +1,262 @@
+# src/fake_gemini.py
+import asyncio
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from google.genai import types
+
+# A chunk is one streamed response in the REST API's JSON shape, e.g.
+# {"candidates": [{"content": {"role": "model", "parts": [{"text": "..."}]}}]}
+Chunk = Dict[str, Any]
+Script = Union[Sequence[List[Chunk]], Callable[[int, List[Any]], List[Chunk]]]
+
+
+def text_chunk(text: str) -> Chunk:
+    """
+    Returns a streamed chunk carrying model text.
+    """
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+def function_call_chunk(*calls: Dict[str, Any]) -> Chunk:
+    """
+    Returns a streamed chunk carrying function calls, each given as {"name": ..., "args": {...}}.
+    """
+    parts = [{"functionCall": {"name": call["name"], "args": call.get("args", {})}} for call in calls]
+    return {"candidates": [{"content": {"role": "model", "parts": parts}}]}
+
+
+def chunk_to_response(chunk: Chunk) -> types.GenerateContentResponse:
+    """
+    Converts a JSON chunk to the SDK response object the agents consume.
+    """
+    candidates = []
+    for candidate in chunk.get("candidates", []):
+        parts = []
+        for part in candidate.get("content", {}).get("parts", []):
+            if "functionCall" in part:
+                call = part["functionCall"]
+                parts.append(types.Part(
+                    function_call=types.FunctionCall(name=call["name"], args=call.get("args", {}))
+                ))
+            else:
+                parts.append(types.Part(text=part.get("text", "")))
+        candidates.append(types.Candidate(content=types.Content(role="model", parts=parts)))
+    return types.GenerateContentResponse(candidates=candidates)
+
+
+def response_to_chunk(response: types.GenerateContentResponse) -> Chunk:
+    """
+    Converts an SDK response back to a JSON chunk, keeping only text and function calls.
+    """
+    candidates = []
+    for candidate in response.candidates or []:
+        parts = []
+        for part in (candidate.content.parts if candidate.content else None) or []:
+            if part.function_call:
+                parts.append({"functionCall": {
+                    "name": part.function_call.name,
+                    "args": dict(part.function_call.args or {}),
+                }})
+            elif part.text:
+                parts.append({"text": part.text})
+        candidates.append({"content": {"role": "model", "parts": parts}})
+    return {"candidates": candidates}
+
+
+class FakeGeminiBackend:
+    """
+    Scripted stand-in for the Gemini API, for measuring our own overhead offline.
+
+    `script` is either a list of responses (each a list of chunks) served in
+    order, or a function of (request number, request contents) returning the
+    chunks. A list script is repeated from the start when `cycle` is set;
+    otherwise `default_text` is returned once it runs out. `latency` is added
+    before the first chunk of every response and `chunk_latency` before each
+    following one.
+    """
+
+    def __init__(
+        self,
+        script: Optional[Script] = None,
+        latency: float = 0.0,
+        chunk_latency: float = 0.0,
+        cycle: bool = False,
+        default_text: str = "Nothing more to do.",
+    ):
+        self.script = script or []
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.cycle = cycle
+        self.default_text = default_text
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def next_response(self, contents: List[Any]) -> List[Chunk]:
+        """
+        Returns the chunks of the response to the next request.
+        """
+        with self._lock:
+            index = self.requests
+            self.requests += 1
+        if callable(self.script):
+            return self.script(index, contents)
+        if self.script and (index < len(self.script) or self.cycle):
+            return self.script[index % len(self.script)]
+        return [text_chunk(self.default_text)]
+
+    def stream(self, contents: List[Any]) -> Iterator[Chunk]:
+        """
+        Yields the chunks of the next response with the configured latency.
+        """
+        for position, chunk in enumerate(self.next_response(contents)):
+            delay = self.latency if position == 0 else self.chunk_latency
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+
+class _FakeModels:
+    def __init__(self, backend: FakeGeminiBackend):
+        self._backend = backend
+
+    def generate_content_stream(self, model: str, contents: List[Any], config: Any = None):
+        for chunk in self._backend.stream(contents):
+            yield chunk_to_response(chunk)
+
+    def generate_content(self, model: str, contents: List[Any], config: Any = None):
+        return chunk_to_response(_merge_chunks(list(self._backend.stream(contents))))
+
+
+class _FakeAsyncModels:
+    def __init__(self, backend: FakeGeminiBackend):
+        self._backend = backend
+
+    async def generate_content_stream(self, model: str, contents: List[Any], config: Any = None):
+        backend = self._backend
+        chunks = backend.next_response(contents)
+
+        async def stream():
+            for position, chunk in enumerate(chunks):
+                delay = backend.latency if position == 0 else backend.chunk_latency
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk_to_response(chunk)
+
+        return stream()
+
+
+class _FakeAio:
+    def __init__(self, backend: FakeGeminiBackend):
+        self.models = _FakeAsyncModels(backend)
+
+
+class FakeGeminiClient:
+    """
+    In-process drop-in for `genai.Client` covering the calls the agents make;
+    pass it as `client`/`gemini_client` to GeminiChatAgent or AIComponentManager.
+    """
+
+    def __init__(self, backend: Optional[FakeGeminiBackend] = None):
+        self.backend = backend or FakeGeminiBackend()
+        self.models = _FakeModels(self.backend)
+        self.aio = _FakeAio(self.backend)
+
+
+def _merge_chunks(chunks: List[Chunk]) -> Chunk:
+    """
+    Joins streamed chunks into the single response generateContent returns.
+    """
+    parts: List[Dict[str, Any]] = []
+    for chunk in chunks:
+        for candidate in chunk.get("candidates", []):
+            parts.extend(candidate.get("content", {}).get("parts", []))
+    return {"candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP"}]}
+
+
+class _FakeGeminiRequestHandler(BaseHTTPRequestHandler):
+    backend: FakeGeminiBackend
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if not path.endswith((":generateContent", ":streamGenerateContent")):
+            self.send_error(404, f"Unknown method {path}")
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_error(400, "Request body is not JSON")
+            return
+        contents = body.get("contents", [])
+
+        if path.endswith(":generateContent"):
+            payload = json.dumps(_merge_chunks(list(self.backend.stream(contents)))).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        # streamGenerateContent, as server-sent events (alt=sse)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for chunk in self.backend.stream(contents):
+            self.wfile.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode("utf-8"))
+            self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format: str, *args: Any):
+        # Keep benchmark output clean
+        pass
+
+
+class FakeGeminiServer:
+    """
+    Serves a FakeGeminiBackend over HTTP on localhost, speaking the
+    `models/{model}:generateContent` and `:streamGenerateContent?alt=sse`
+    shapes of the Gemini REST API. Point a client at `base_url` (for example
+    via the GEMINI_API_BASE_URL environment variable) to use it.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, backend: Optional[FakeGeminiBackend] = None, host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend or FakeGeminiBackend()
+        handler = type(
+            f"_FakeGeminiRequestHandler{next(self._ids)}",
+            (_FakeGeminiRequestHandler,),
+            {"backend": self.backend},
+        )
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeGeminiServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
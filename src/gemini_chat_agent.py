@@ -1,13 +1,37 @@
 # src/gemini_chat_agent.py
+import contextvars
 import os
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, List, Optional
 
 from google import genai
 from google.genai import errors, types
 
+from src.cassette import Cassette, CassetteClient
+from src.event_log import timed_event
+from src.history_manager import ChatHistoryManager
 from src.logger import log_message # Import logger
+from src.rate_limiter import RateLimiter, get_shared_rate_limiter
+from src.result_store import ToolResultStore, get_result_store, using_result_store
+from src.tracing import span, traced
+
+
+def create_gemini_client(api_key: Optional[str] = None) -> genai.Client:
+    """
+    Creates a Gemini client from `api_key` or the GEMINI_API_KEY environment variable.
+    GEMINI_API_BASE_URL, if set, points it at another endpoint (e.g. a local FakeGeminiServer).
+    """
+    _api_key = api_key or os.environ.get("GEMINI_API_KEY")
+    if not _api_key:
+        raise ValueError(
+            "GEMINI_API_KEY must be provided via `api_key` argument or "
+            "set as an environment variable."
+        )
+    base_url = os.environ.get("GEMINI_API_BASE_URL")
+    if base_url:
+        return genai.Client(api_key=_api_key, http_options=types.HttpOptions(base_url=base_url))
+    return genai.Client(api_key=_api_key)
 
 
 class GeminiChatAgent:
@@ -17,21 +41,33 @@ class GeminiChatAgent:
     Now supports continuous autonomous operation with user interruption.
     """
 
-    RPM_LIMIT = 15
-
     def __init__(
         self,
         model_name: str = "gemini-1.5-flash-latest",
         api_key: Optional[str] = None,
         initial_system_prompt: Optional[str] = None,
+        max_parallel_tool_calls: int = 4,
+        max_tool_depth: int = 8,
+        max_requests_per_turn: int = 10,
+        history_token_budget: Optional[int] = 200_000,
+        result_store: Optional[ToolResultStore] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        client: Optional[genai.Client] = None,
+        cassette_path: Optional[str] = None,
+        cassette_mode: Optional[str] = None,
+        text_callback: Optional[Callable[[str], Any]] = None,
     ):
-        _api_key = api_key or os.environ.get("GEMINI_API_KEY")
-        if not _api_key:
-            raise ValueError(
-                "GEMINI_API_KEY must be provided via `api_key` argument or "
-                "set as an environment variable."
-            )
-        self.gemini_client = genai.Client(api_key=_api_key)
+        if cassette_mode:
+            # "record" saves every request and response to `cassette_path`;
+            # "replay" answers requests from it without touching the network.
+            cassette = Cassette(cassette_path, cassette_mode)
+            if cassette_mode == "record" and client is None:
+                client = create_gemini_client(api_key)
+            client = CassetteClient(cassette, client)
+        elif client is None:
+            client = create_gemini_client(api_key)
+        # A client passed in may be shared with other agents, so they share its connection pool
+        self.gemini_client = client
         self.model_name = model_name
         self.chat_history: List[types.Content] = []
 
@@ -39,9 +75,25 @@ class GeminiChatAgent:
             self.chat_history.append(
                 types.Content(role="user", parts=[types.Part(text=initial_system_prompt)])
             )
+        # The system prompt is never compacted away
+        self._pinned_messages = len(self.chat_history)
+        self.history_manager = ChatHistoryManager(token_budget=history_token_budget)
+        # Large tool results are kept out of the history; it gets a preview and a handle
+        self.result_store = result_store or get_result_store()
 
-        self.request_timestamps = deque()
+        # Shared with every other agent and GeminiAPIAccess in the process unless one is given
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
         self._tool_executor_callback: Optional[Callable[[types.FunctionCall], Any]] = None
+        # Tells whether a tool's calls may run concurrently; without it every call runs in order
+        self._parallel_safe_callback: Optional[Callable[[str], bool]] = None
+        # Receives model text as it streams in, chunk by chunk
+        self._text_callback = text_callback
+        # Calls to parallel-safe tools from the same response run concurrently, up to this many at once
+        self.max_parallel_tool_calls = max_parallel_tool_calls
+        # Bounds on chained tool calls within one turn: rounds of tool execution
+        # and model requests (including the initial one)
+        self.max_tool_depth = max_tool_depth
+        self.max_requests_per_turn = max_requests_per_turn
 
     def set_tool_executor_callback(self, callback: Callable[[types.FunctionCall], Any]):
         """
@@ -49,35 +101,174 @@ class GeminiChatAgent:
         """
         self._tool_executor_callback = callback
 
-    def _apply_rate_limit(self):
+    def set_parallel_safe_callback(self, callback: Optional[Callable[[str], bool]]):
         """
-        Applies a rate limit by pausing execution if the RPM_LIMIT is approached.
+        Sets a callback that tells, by tool name, whether calls to a tool may
+        run concurrently with each other and with other calls.
         """
-        current_time = time.time()
+        self._parallel_safe_callback = callback
 
-        while (
-            self.request_timestamps and self.request_timestamps[0] <= current_time - 60
-        ):
-            self.request_timestamps.popleft()
+    def set_text_callback(self, callback: Optional[Callable[[str], Any]]):
+        """
+        Sets a callback that receives each chunk of model text as it is streamed.
+        """
+        self._text_callback = callback
 
-        if len(self.request_timestamps) >= self.RPM_LIMIT:
-            wait_time = self.request_timestamps[0] + 60 - current_time
-            if wait_time > 0:
-                log_message("RATE_LIMIT", f"Waiting for {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-                current_time = time.time()
-                while (
-                    self.request_timestamps
-                    and self.request_timestamps[0] <= current_time - 60
-                ):
-                    self.request_timestamps.popleft()
+    def _emit_text(self, text: str):
+        """
+        Logs a chunk of model text and passes it to the text callback.
+        """
+        log_message("AI_THOUGHT", text, end="")
+        if self._text_callback:
+            try:
+                self._text_callback(text)
+            except Exception as e:
+                log_message("WARNING", f"Text callback failed: {e}")
 
-        self.request_timestamps.append(time.time())
+    @staticmethod
+    def _text_parts(text_chunks: List[str]) -> List[types.Part]:
+        """
+        Joins streamed text chunks into a single part, so the history holds one
+        part per response instead of one per chunk.
+        """
+        text = "".join(text_chunks)
+        return [types.Part(text=text)] if text else []
 
-    def continue_autonomously(self, tools: List[types.Tool], interrupt_message: Optional[str] = None) -> None:
+    def _execute_tool(self, function_call: types.FunctionCall) -> Any:
         """
-        Causes the Gemini model to continue its internal thought process or action.
-        Allows for an optional interrupt message from the user.
+        Executes a single function call through the tool executor callback.
+        """
+        if not self._tool_executor_callback:
+            error_message = f"Error: Tool executor callback not set for {function_call.name}."
+            log_message("AI_UNEXPECTED_ERROR", error_message)
+            return error_message
+        try:
+            # ToolResultReader reads the handles of this agent's store
+            with using_result_store(self.result_store):
+                return self._tool_executor_callback(function_call)
+        except Exception as e:
+            error_message = f"Error executing tool '{function_call.name}': {e}"
+            log_message("AI_UNEXPECTED_ERROR", error_message)
+            return error_message
+
+    def _group_function_calls(self, function_calls: List[types.FunctionCall]) -> List[List[int]]:
+        """
+        Splits the calls of one response into groups that may run concurrently,
+        as lists of call positions. Calls to tools that are not parallel-safe
+        share one group and keep their order; each call to a parallel-safe
+        tool is a group of its own.
+        """
+        sequential: List[int] = []
+        groups: List[List[int]] = [sequential]
+        for index, fc_item in enumerate(function_calls):
+            if self._parallel_safe_callback and self._parallel_safe_callback(fc_item.name):
+                groups.append([index])
+            else:
+                sequential.append(index)
+        return [group for group in groups if group]
+
+    def _execute_call_group(self, function_calls: List[types.FunctionCall], group: List[int]) -> List[Any]:
+        """
+        Executes the calls of one group in order.
+        """
+        return [self._execute_tool(function_calls[index]) for index in group]
+
+    def _execute_function_calls(
+        self,
+        function_calls: List[types.FunctionCall],
+        preceding_parts: Optional[List[types.Part]] = None,
+    ):
+        """
+        Executes all function calls from one model response and records them in
+        the chat history as a single model turn (any text the model produced
+        before the calls, then the calls) followed by a single user turn (all
+        results, in call order).
+        Calls to parallel-safe tools are dispatched concurrently with each
+        other and with the remaining calls, which run one at a time in order.
+        """
+        for fc_item in function_calls:
+            log_message("AI_ACTION", f"Calling tool: {fc_item.name}({fc_item.args})")
+
+        groups = self._group_function_calls(function_calls)
+        results: List[Any] = [None] * len(function_calls)
+        if len(groups) > 1 and self.max_parallel_tool_calls > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_parallel_tool_calls, len(groups))
+            ) as executor:
+                # Each group runs in a copy of this context, so its events keep the session and turn ids
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._execute_call_group, function_calls, group)
+                    for group in groups
+                ]
+                for group, future in zip(groups, futures):
+                    for index, result in zip(group, future.result()):
+                        results[index] = result
+        else:
+            results = [self._execute_tool(fc_item) for fc_item in function_calls]
+
+        self._record_function_calls(function_calls, results, preceding_parts)
+
+    def _record_function_calls(
+        self,
+        function_calls: List[types.FunctionCall],
+        results: List[Any],
+        preceding_parts: Optional[List[types.Part]] = None,
+    ):
+        """
+        Appends executed function calls and their results to the chat history.
+        """
+        self.chat_history.append(
+            types.Content(
+                role="model",
+                parts=list(preceding_parts or []) + [
+                    types.Part(
+                        function_call=types.FunctionCall(name=fc_item.name, args=fc_item.args)
+                    )
+                    for fc_item in function_calls
+                ],
+            )
+        )
+        self.chat_history.append(
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part(text=self.result_store.offload(fc_item.name, str(result)))
+                    for fc_item, result in zip(function_calls, results)
+                ],
+            )
+        )
+        for result in results:
+            log_message("AI_TOOL_RESULT", result)
+
+    @traced()
+    def _apply_rate_limit(self) -> int:
+        """
+        Waits until the rate limiter allows a request carrying the current chat
+        history, estimated by the history manager. Returns the estimate.
+        """
+        estimated_tokens = self.estimate_request_tokens()
+        self.rate_limiter.acquire(estimated_tokens)
+        return estimated_tokens
+
+    def _record_usage(self, usage: Any, estimated_tokens: int) -> Optional[int]:
+        """
+        Corrects the rate limiter's token count for a request by the usage the
+        API reported with its last chunk. Returns the reported total, if any.
+        """
+        total_tokens = usage.total_token_count if usage else None
+        if total_tokens:
+            self.rate_limiter.record_tokens(total_tokens - estimated_tokens)
+        return total_tokens
+
+    def estimate_request_tokens(self) -> int:
+        """
+        Returns the estimated token count of the next request (the whole chat history).
+        """
+        return sum(self.history_manager.estimate_tokens(content) for content in self.chat_history)
+
+    def _start_turn(self, interrupt_message: Optional[str]) -> str:
+        """
+        Appends the user message that starts a turn to the chat history and returns it.
         """
         effective_user_message = interrupt_message
         if not effective_user_message:
@@ -86,10 +277,31 @@ class GeminiChatAgent:
         else:
             log_message("USER", effective_user_message)
 
-
         self.chat_history.append(
             types.Content(role="user", parts=[types.Part(text=effective_user_message)])
         )
+        return effective_user_message
+
+    def _discard_turn_message(self, effective_user_message: str):
+        """
+        Removes the turn's user message again after a failed request, so it can be retried.
+        """
+        if self.chat_history and \
+           self.chat_history[-1].role == "user" and \
+           self.chat_history[-1].parts and \
+           self.chat_history[-1].parts[0].text == effective_user_message:
+            self.chat_history.pop()
+
+    def continue_autonomously(self, tools: List[types.Tool], interrupt_message: Optional[str] = None) -> None:
+        """
+        Causes the Gemini model to continue its internal thought process or action.
+        Allows for an optional interrupt message from the user.
+
+        Tool calls are executed and their results sent back to the model in a
+        loop until it answers without calling tools, up to `max_tool_depth`
+        rounds of tool calls and `max_requests_per_turn` requests.
+        """
+        effective_user_message = self._start_turn(interrupt_message)
 
         generate_content_config = types.GenerateContentConfig(
             tools=tools,
@@ -97,119 +309,69 @@ class GeminiChatAgent:
         )
 
         try:
-            self._apply_rate_limit()
+            requests_sent = 0
+            tool_depth = 0
+            response_text: List[str] = []
 
-            stream = self.gemini_client.models.generate_content_stream(
-                model=self.model_name,
-                contents=self.chat_history,
-                config=generate_content_config,
-            )
+            while True:
+                self.history_manager.compact(self.chat_history, pinned=self._pinned_messages)
+                estimated_tokens = self._apply_rate_limit()
+                function_calls: List[types.FunctionCall] = []
+                usage = None
+                with span("generate_content_stream", model=self.model_name) as request_span, timed_event(
+                    "api_request", model=self.model_name, bytes=self.history_manager.last_bytes_after
+                ) as event:
+                    stream = self.gemini_client.models.generate_content_stream(
+                        model=self.model_name,
+                        contents=self.chat_history,
+                        config=generate_content_config,
+                    )
+                    requests_sent += 1
+
+                    for chunk in stream:
+                        if chunk.usage_metadata:
+                            usage = chunk.usage_metadata
+                        if chunk.function_calls:
+                            function_calls.extend(chunk.function_calls)
+                        elif chunk.text:
+                            self._emit_text(chunk.text)
+                            response_text.append(chunk.text)
+                    event.update(
+                        function_calls=len(function_calls),
+                        response_bytes=sum(len(text.encode("utf-8")) for text in response_text),
+                        tokens=self._record_usage(usage, estimated_tokens),
+                    )
+                    request_span.set_attribute("function_calls", len(function_calls))
+
+                log_message("AI_THOUGHT", "", end="\n") # Ensure newline after stream
+
+                if not function_calls:
+                    break
+
+                if tool_depth:
+                    log_message("AI_ACTION", "Chained tool call detected.", symbol="⛓️ ")
+                # All calls of the response run together and share one follow-up request
+                self._execute_function_calls(function_calls, preceding_parts=self._text_parts(response_text))
+                response_text = []
+                tool_depth += 1
+
+                if tool_depth >= self.max_tool_depth or requests_sent >= self.max_requests_per_turn:
+                    log_message("WARNING",
+                        f"Stopping tool chain after {tool_depth} rounds and {requests_sent} requests; "
+                        "the latest tool results will be sent with the next turn."
+                    )
+                    break
 
-            tool_execution_occurred_in_turn = False
-            model_response_parts: List[types.Part] = []
-
-            for chunk in stream:
-                if chunk.function_calls:
-                    tool_execution_occurred_in_turn = True
-                    for fc_item in chunk.function_calls:
-                        self.chat_history.append(
-                            types.Content(
-                                role="model",
-                                parts=[
-                                    types.Part(
-                                        function_call=types.FunctionCall(
-                                            name=fc_item.name, args=fc_item.args
-                                        )
-                                    )
-                                ],
-                            )
-                        )
-                        log_message("AI_ACTION", f"Calling tool: {fc_item.name}({fc_item.args})")
-
-                        if self._tool_executor_callback:
-                            tool_result_value = self._tool_executor_callback(fc_item)
-                        else:
-                            tool_result_value = f"Error: Tool executor callback not set for {fc_item.name}."
-                            log_message("AI_UNEXPECTED_ERROR", tool_result_value)
-
-                        self.chat_history.append(
-                            types.Content(
-                                role="user",
-                                parts=[types.Part(text=str(tool_result_value))],
-                            )
-                        )
-                        log_message("AI_TOOL_RESULT", tool_result_value)
-
-                        self._apply_rate_limit()
-                        follow_up_stream = self.gemini_client.models.generate_content_stream(
-                            model=self.model_name,
-                            contents=self.chat_history,
-                            config=generate_content_config,
-                        )
-                        for follow_up_chunk in follow_up_stream:
-                            if follow_up_chunk.text:
-                                log_message("AI_THOUGHT", follow_up_chunk.text, end="")
-                                model_response_parts.append(
-                                    types.Part(text=follow_up_chunk.text)
-                                )
-                            elif follow_up_chunk.function_calls:
-                                log_message("AI_ACTION", "Chained tool call detected.", symbol="⛓️ ")
-                                for next_fc_item in follow_up_chunk.function_calls:
-                                    log_message("AI_ACTION", f"Further call: {next_fc_item.name} with {next_fc_item.args}", symbol="🔗 ")
-                                    if self._tool_executor_callback:
-                                        next_tool_result = self._tool_executor_callback(next_fc_item)
-                                        log_message("AI_TOOL_RESULT", next_tool_result, symbol="✅ ")
-                                        self.chat_history.append(
-                                            types.Content(
-                                                role="model",
-                                                parts=[types.Part(function_call=types.FunctionCall(name=next_fc_item.name, args=next_fc_item.args))]
-                                            )
-                                        )
-                                        self.chat_history.append(
-                                            types.Content(
-                                                role="user",
-                                                parts=[types.Part(text=str(next_tool_result))]
-                                            )
-                                        )
-                                        self._apply_rate_limit()
-                                        final_gen_stream = self.gemini_client.models.generate_content_stream(
-                                            model=self.model_name,
-                                            contents=self.chat_history,
-                                            config=generate_content_config,
-                                        )
-                                        for final_chunk in final_gen_stream:
-                                            if final_chunk.text:
-                                                log_message("AI_THOUGHT", final_chunk.text, end="")
-                                                model_response_parts.append(types.Part(text=final_chunk.text))
-                                        
-                        log_message("AI_THOUGHT", "", end="\n") # Ensure newline after stream
-                        break
-
-                elif chunk.text:
-                    log_message("AI_THOUGHT", chunk.text, end="")
-                    model_response_parts.append(types.Part(text=chunk.text))
-
-            log_message("AI_THOUGHT", "", end="\n") # Ensure newline after AI's final text response
-
-
-            if model_response_parts:
+            if response_text:
                 self.chat_history.append(
-                    types.Content(role="model", parts=model_response_parts)
+                    types.Content(role="model", parts=self._text_parts(response_text))
                 )
 
         except errors.ClientError as e:
             log_message("AI_API_ERROR", f"ClientError: {e}")
-            if self.chat_history and \
-               self.chat_history[-1].role == "user" and \
-               self.chat_history[-1].parts and \
-               self.chat_history[-1].parts[0].text == effective_user_message:
-                self.chat_history.pop()
+            self._discard_turn_message(effective_user_message)
             time.sleep(5)
         except Exception as e:
             log_message("AI_UNEXPECTED_ERROR", f"Unexpected Error: {e}")
             log_message("AI_UNEXPECTED_ERROR", "Please try again or type an interrupt message.")
-            if self.chat_history and \
-               self.chat_history[-1].role == "user" and \
-               self.chat_history[-1].parts and \
-               self.chat_history[-1].parts[0].text == effective_user_message:
-                self.chat_history.pop()
\ No newline at end of file
+            self._discard_turn_message(effective_user_message)
\ No newline at end of file
@@ -0,0 +1,152 @@
+# src/headless_runner.py
+import json
+import queue
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.ai_manager import AIComponentManager
+from src.logger import log_message
+
+STOP_MESSAGES = ("exit", "quit")
+
+
+def file_feed(path: str) -> Iterator[str]:
+    """
+    Yields one interrupt message per line of a file. Empty lines let the AI proceed on its own.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def stdin_feed() -> Iterator[str]:
+    """
+    Yields one interrupt message per line piped to stdin, until EOF.
+    """
+    for line in sys.stdin:
+        yield line.rstrip("\n")
+
+
+def queue_feed(message_queue: "queue.Queue[Optional[str]]") -> Iterator[str]:
+    """
+    Yields messages put on a queue by another thread until it receives None.
+    """
+    while True:
+        message = message_queue.get()
+        if message is None:
+            return
+        yield message
+
+
+class HeadlessRunner:
+    """
+    Runs autonomous turns without a TTY, taking interrupt messages from a feed
+    (file, stdin pipe or queue) instead of `input()`.
+
+    Stops after `max_turns` turns, when the feed runs out (unless `max_turns`
+    asks for more; remaining turns then proceed without guidance), on an
+    "exit"/"quit" message, or when `stop_condition` returns True after a turn.
+    The wall time and request count of every turn are recorded and summarized.
+    """
+
+    def __init__(
+        self,
+        ai_manager: AIComponentManager,
+        feed: Optional[Iterable[str]] = None,
+        max_turns: Optional[int] = None,
+        stop_condition: Optional[Callable[[AIComponentManager], bool]] = None,
+        timings_path: Optional[str] = None,
+    ):
+        if feed is None and max_turns is None:
+            raise ValueError("A headless run needs a message feed, a turn limit, or both.")
+        self.ai_manager = ai_manager
+        self.feed = iter(feed) if feed is not None else None
+        self.max_turns = max_turns
+        self.stop_condition = stop_condition
+        self.timings_path = timings_path
+        self.turn_timings: List[Dict[str, float]] = []
+
+    def _next_message(self) -> Optional[str]:
+        """
+        Returns the next interrupt message, "" to proceed unguided, or None to stop.
+        """
+        if self.feed is not None:
+            try:
+                return next(self.feed)
+            except StopIteration:
+                self.feed = None
+                if self.max_turns is None:
+                    return None
+        return ""
+
+    def run(self) -> List[Dict[str, float]]:
+        """
+        Runs turns until a stop condition is met and returns the per-turn timings.
+        """
+        log_message("SYSTEM_INIT", "--- Starting headless AI loop ---")
+        self.ai_manager.start()
+        try:
+            while self.max_turns is None or len(self.turn_timings) < self.max_turns:
+                message = self._next_message()
+                if message is None or message.strip().lower() in STOP_MESSAGES:
+                    break
+
+                history_manager = self.ai_manager.gemini_agent.history_manager
+                requests_before = history_manager.requests
+                start = time.perf_counter()
+                self.ai_manager.run_turn(message)
+                elapsed = time.perf_counter() - start
+
+                timing = {
+                    "turn": len(self.turn_timings) + 1,
+                    "seconds": elapsed,
+                    "requests": history_manager.requests - requests_before,
+                }
+                self.turn_timings.append(timing)
+                log_message("SYSTEM_TIMING",
+                    f"Turn {timing['turn']} took {elapsed:.3f}s ({timing['requests']} requests)."
+                )
+
+                if self.stop_condition and self.stop_condition(self.ai_manager):
+                    break
+        finally:
+            self.ai_manager.shutdown()
+
+        self._report()
+        return self.turn_timings
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns turn count, total and mean/p50/p95/max turn time in seconds.
+        """
+        durations = sorted(timing["seconds"] for timing in self.turn_timings)
+        if not durations:
+            return {"turns": 0}
+
+        def percentile(p: float) -> float:
+            return durations[min(len(durations) - 1, int(p * len(durations)))]
+
+        return {
+            "turns": len(durations),
+            "total": sum(durations),
+            "mean": sum(durations) / len(durations),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": durations[-1],
+        }
+
+    def _report(self):
+        summary = self.summary()
+        if summary["turns"]:
+            log_message("SYSTEM_TIMING",
+                f"{summary['turns']} turns in {summary['total']:.3f}s "
+                f"(mean {summary['mean']:.3f}s, p50 {summary['p50']:.3f}s, "
+                f"p95 {summary['p95']:.3f}s, max {summary['max']:.3f}s)."
+            )
+        else:
+            log_message("SYSTEM_EXIT", "No turns were run.")
+
+        if self.timings_path:
+            with open(self.timings_path, "w", encoding="utf-8") as f:
+                json.dump({"turns": self.turn_timings, "summary": summary}, f, indent=2)
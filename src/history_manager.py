@@ -0,0 +1,178 @@
+# src/history_manager.py
+import json
+from typing import Dict, List, Optional, Tuple
+
+from google.genai import types
+
+from src.logger import log_message
+from src.result_store import ToolResultStore
+
+
+class ChatHistoryManager:
+    """
+    Keeps the chat history sent with every Gemini request within an estimated
+    token budget.
+
+    Token counts are estimated from the size of each `types.Content` and cached
+    per message. When the history exceeds the budget, older tool results and
+    then older model text are truncated to a short preview, oldest first.
+    Pinned messages (the system prompt) and the most recent messages are never
+    touched. For every request, the size the history would have had without
+    any compaction and the size actually sent are recorded.
+    """
+
+    # Ends every truncated part, so parts that already are a preview are left alone
+    TRUNCATION_MARKER = " characters omitted to save context ...]"
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = 200_000,
+        keep_recent: int = 10,
+        truncated_chars: int = 500,
+        chars_per_token: int = 4,
+    ):
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.truncated_chars = truncated_chars
+        self.chars_per_token = chars_per_token
+        # id(content) -> (content, size in bytes); the content is kept so its id stays unique
+        self._size_cache: Dict[int, Tuple[types.Content, int]] = {}
+        # Bytes removed from the history by all compactions so far
+        self._saved_bytes = 0
+        self._warned_over_budget = False
+
+        self.requests = 0
+        self.compactions = 0
+        self.last_bytes_before = 0
+        self.last_bytes_after = 0
+        self.total_bytes_before = 0
+        self.total_bytes_after = 0
+
+    @staticmethod
+    def _part_size(part: types.Part) -> int:
+        size = len(part.text.encode("utf-8")) if part.text else 0
+        if part.function_call:
+            size += len(part.function_call.name or "")
+            size += len(json.dumps(part.function_call.args or {}, default=str))
+        return size
+
+    def content_size(self, content: types.Content) -> int:
+        """
+        Returns the approximate payload size of a message in bytes.
+        """
+        cached = self._size_cache.get(id(content))
+        if cached and cached[0] is content:
+            return cached[1]
+        size = sum(self._part_size(part) for part in content.parts or [])
+        self._size_cache[id(content)] = (content, size)
+        return size
+
+    def estimate_tokens(self, content: types.Content) -> int:
+        """
+        Returns the estimated token count of a message.
+        """
+        return -(-self.content_size(content) // self.chars_per_token)
+
+    def history_size(self, history: List[types.Content]) -> int:
+        return sum(self.content_size(content) for content in history)
+
+    @staticmethod
+    def is_tool_result(history: List[types.Content], index: int) -> bool:
+        """
+        Tool results are the user messages directly following a model message
+        with function calls.
+        """
+        if index == 0 or history[index].role != "user":
+            return False
+        previous = history[index - 1]
+        return previous.role == "model" and any(part.function_call for part in previous.parts or [])
+
+    def _truncate(self, content: types.Content) -> Optional[types.Content]:
+        """
+        Returns a copy of a message with long text parts cut down to a preview,
+        or None if there was nothing to cut. Parts truncated before are kept as
+        they are, with their original omitted count, and so are previews of
+        offloaded tool results, which must keep their handle.
+        """
+        changed = False
+        parts = []
+        for part in content.parts or []:
+            if part.text and len(part.text) > self.truncated_chars and \
+               not part.text.endswith(self.TRUNCATION_MARKER) and \
+               not ToolResultStore.is_preview(part.text):
+                omitted = len(part.text) - self.truncated_chars
+                part = types.Part(
+                    text=f"{part.text[:self.truncated_chars]}\n[... {omitted}{self.TRUNCATION_MARKER}"
+                )
+                changed = True
+            parts.append(part)
+        return types.Content(role=content.role, parts=parts) if changed else None
+
+    def compact(self, history: List[types.Content], pinned: int = 0):
+        """
+        Compacts `history` in place if it exceeds the token budget and records
+        the request size without and with compaction.
+        `pinned` is the number of leading messages (e.g. the system prompt) to keep verbatim.
+        """
+        size_before = self.history_size(history)
+        size = size_before
+
+        if self.token_budget is not None and size // self.chars_per_token > self.token_budget:
+            budget_bytes = self.token_budget * self.chars_per_token
+            compactable = range(pinned, max(pinned, len(history) - self.keep_recent))
+            # Old tool results first, then old model text
+            for should_truncate in (
+                lambda i: self.is_tool_result(history, i),
+                lambda i: history[i].role == "model",
+            ):
+                for index in compactable:
+                    if size <= budget_bytes:
+                        break
+                    if not should_truncate(index):
+                        continue
+                    truncated = self._truncate(history[index])
+                    if truncated:
+                        saved = self.content_size(history[index]) - self.content_size(truncated)
+                        size -= saved
+                        self._saved_bytes += saved
+                        history[index] = truncated
+
+            if size < size_before:
+                self.compactions += 1
+                log_message("SYSTEM_HISTORY",
+                    f"Compacted chat history from ~{size_before // self.chars_per_token} "
+                    f"to ~{size // self.chars_per_token} tokens."
+                )
+            if size > budget_bytes and not self._warned_over_budget:
+                log_message("WARNING", "Chat history is still over its token budget after compaction.")
+                self._warned_over_budget = True
+        else:
+            self._warned_over_budget = False
+
+        # Drop cached sizes of messages that are no longer in the history
+        if len(self._size_cache) > 2 * len(history):
+            live_ids = {id(content) for content in history}
+            self._size_cache = {
+                key: value for key, value in self._size_cache.items() if key in live_ids
+            }
+
+        self.requests += 1
+        self.last_bytes_before = size + self._saved_bytes
+        self.last_bytes_after = size
+        self.total_bytes_before += self.last_bytes_before
+        self.total_bytes_after += size
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns request size metrics: bytes of history per request without and
+        with compaction (last request and totals).
+        """
+        return {
+            "requests": self.requests,
+            "compactions": self.compactions,
+            "last_bytes_before": self.last_bytes_before,
+            "last_bytes_after": self.last_bytes_after,
+            "total_bytes_before": self.total_bytes_before,
+            "total_bytes_after": self.total_bytes_after,
+        }
@@ -0,0 +1,78 @@
+# src/http_session.py
+import os
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.logger import log_message
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _setting(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        log_message("WARNING", f"Ignoring invalid {name}={value!r}; using {default}.")
+        return default
+
+
+def create_http_session(pool_size: int = 10, retries: int = 3, backoff_factor: float = 1.0) -> requests.Session:
+    """
+    Returns a session that keeps up to `pool_size` connections per host alive
+    and retries connection failures and 429/5xx responses up to `retries`
+    times with exponential backoff (honouring Retry-After).
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        # A request that timed out mid-read may already have been served; don't send it twice
+        read=0,
+        status=retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        # Hand the last error response back so callers report its status
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_timeout() -> Tuple[float, float]:
+    """
+    Returns the (connect, read) timeout in seconds for API requests, from
+    GEMINI_HTTP_CONNECT_TIMEOUT (default 10) and GEMINI_HTTP_TIMEOUT (default 60).
+    """
+    return _setting("GEMINI_HTTP_CONNECT_TIMEOUT", 10.0), _setting("GEMINI_HTTP_TIMEOUT", 60.0)
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Returns the process-wide pooled session. Configured by GEMINI_HTTP_POOL_SIZE
+    (default 10), GEMINI_HTTP_RETRIES (default 3) and GEMINI_HTTP_BACKOFF
+    (backoff factor in seconds, default 1.0).
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_http_session(
+                pool_size=int(_setting("GEMINI_HTTP_POOL_SIZE", 10)),
+                retries=int(_setting("GEMINI_HTTP_RETRIES", 3)),
+                backoff_factor=_setting("GEMINI_HTTP_BACKOFF", 1.0),
+            )
+        return _shared_session
@@ -1,5 +1,10 @@
 # src/logger.py
+import atexit
+import os
 import sys
+import threading
+from collections import deque
+from typing import Deque, Optional, TextIO, Tuple, Union
 
 from src.colors import (
     BOLD,
@@ -17,6 +22,145 @@ from src.colors import (
     YELLOW,
 )
 
+# Define prefixes and colors based on level for less verbosity
+LEVEL_MAP = {
+    "USER": (BRIGHT_BLUE, "👤 "),
+    "AI_INTERNAL_PROMPT": (BRIGHT_CYAN, "💭 "),
+    "AI_THOUGHT": (CYAN, "💡 "),
+    "AI_ACTION": (MAGENTA, "🚀 "),
+    "AI_TOOL_RESULT": (GREEN, "✅ "),
+    "AI_API_ERROR": (BRIGHT_RED, "❌ "),
+    "AI_UNEXPECTED_ERROR": (RED, "💥 "),
+    "SYSTEM_INIT": (BOLD + GREEN, "✨ "),
+    "SYSTEM_RELOAD": (BOLD + YELLOW, "🔄 "),
+    "SYSTEM_TOOL_BUILD": (YELLOW, "🛠️ "),
+    "SYSTEM_HISTORY": (BRIGHT_BLACK, "🗜️ "),
+    "SYSTEM_TIMING": (BRIGHT_BLACK, "⏱️ "),
+    "SYSTEM_EXIT": (BRIGHT_BLACK, "👋 "),
+    "RATE_LIMIT": (BRIGHT_YELLOW, "⏳ "),
+    "WARNING": (YELLOW, "⚠️ "),
+}
+
+# None: decide from the first stream written to (colors only on a TTY,
+# overridden by the NO_COLOR / FORCE_COLOR environment variables)
+_colors_enabled: Optional[bool] = None
+# Whether to flush after every synchronous write; decided like colors, from whether the stream is a TTY
+_flush_each_write: Optional[bool] = None
+
+# Set while the background writer is running. Entries are (stream, text) or
+# an Event the writer sets once everything before it has been written.
+_log_buffer: Optional[Deque[Union[Tuple[TextIO, str], threading.Event]]] = None
+_writer_thread: Optional[threading.Thread] = None
+_writer_stop = threading.Event()
+_writer_lock = threading.Lock()
+
+
+def set_colors_enabled(enabled: Optional[bool]):
+    """
+    Turns ANSI colors on or off; None detects it again from the output stream.
+    """
+    global _colors_enabled
+    _colors_enabled = enabled
+
+
+def _is_tty(stream: TextIO) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def _detect_colors(stream: TextIO) -> bool:
+    if os.environ.get("NO_COLOR"):
+        return False
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    return _is_tty(stream)
+
+
+def _drain(log_buffer: Deque):
+    """
+    Writes everything buffered so far with one write and one flush per stream.
+    """
+    pending = {}
+    markers = []
+    while True:
+        try:
+            entry = log_buffer.popleft()
+        except IndexError:
+            break
+        if isinstance(entry, threading.Event):
+            markers.append(entry)
+            continue
+        stream, text = entry
+        pending.setdefault(id(stream), (stream, []))[1].append(text)
+
+    for stream, texts in pending.values():
+        try:
+            stream.write("".join(texts))
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+    for marker in markers:
+        marker.set()
+
+
+def _write_batches(log_buffer: Deque, interval: float):
+    """
+    Background writer: wakes every `interval` seconds and writes out whatever piled up.
+    """
+    while not _writer_stop.wait(interval):
+        _drain(log_buffer)
+    _drain(log_buffer)
+
+
+def start_async_logging(interval: float = 0.02):
+    """
+    Hands log output to a background thread, so log_message only formats and
+    appends to a buffer. The thread writes the buffer every `interval`
+    seconds with a single write and flush.
+    """
+    global _log_buffer, _writer_thread
+    with _writer_lock:
+        if _writer_thread:
+            return
+        _writer_stop.clear()
+        _log_buffer = deque()
+        _writer_thread = threading.Thread(
+            target=_write_batches, args=(_log_buffer, interval), name="LogWriter", daemon=True
+        )
+        _writer_thread.start()
+
+
+def flush_logs():
+    """
+    Waits until everything logged so far has been written.
+    """
+    log_buffer = _log_buffer
+    if log_buffer is not None:
+        marker = threading.Event()
+        log_buffer.append(marker)
+        # Bounded, in case the writer stopped in the meantime
+        marker.wait(timeout=5)
+
+
+def stop_async_logging():
+    """
+    Writes any buffered output and goes back to writing synchronously.
+    """
+    global _log_buffer, _writer_thread
+    with _writer_lock:
+        if not _writer_thread:
+            return
+        writer_thread = _writer_thread
+        _log_buffer = None
+        _writer_thread = None
+    _writer_stop.set()
+    writer_thread.join()
+
+
+atexit.register(stop_async_logging)
+
 
 def log_message(
     level: str,
@@ -35,28 +179,29 @@ def log_message(
         symbol (str): A symbol to prepend to the message.
         end (str): What to append after the message (defaults to newline).
     """
-    # Define prefixes and colors based on level for less verbosity
-    level_map = {
-        "USER": (BRIGHT_BLUE, "👤 "),
-        "AI_INTERNAL_PROMPT": (BRIGHT_CYAN, "💭 "),
-        "AI_THOUGHT": (CYAN, "💡 "),
-        "AI_ACTION": (MAGENTA, "🚀 "),
-        "AI_TOOL_RESULT": (GREEN, "✅ "),
-        "AI_API_ERROR": (BRIGHT_RED, "❌ "),
-        "AI_UNEXPECTED_ERROR": (RED, "💥 "),
-        "SYSTEM_INIT": (BOLD + GREEN, "✨ "),
-        "SYSTEM_RELOAD": (BOLD + YELLOW, "🔄 "),
-        "SYSTEM_TOOL_BUILD": (YELLOW, "🛠️ "),
-        "SYSTEM_EXIT": (BRIGHT_BLACK, "👋 "),
-        "RATE_LIMIT": (BRIGHT_YELLOW, "⏳ "),
-        "WARNING": (YELLOW, "⚠️ "),
-    }
-
-    lvl_color, lvl_symbol = level_map.get(level, (color, symbol))
+    global _colors_enabled, _flush_each_write
+    stream = sys.stdout
+    if _colors_enabled is None:
+        _colors_enabled = _detect_colors(stream)
+    if _flush_each_write is None:
+        _flush_each_write = _is_tty(stream)
+
+    lvl_color, lvl_symbol = LEVEL_MAP.get(level, (color, symbol))
 
     # Construct the log string
-    log_string = f"{lvl_color}{lvl_symbol}{message}{RESET}"
+    if _colors_enabled:
+        log_string = f"{lvl_color}{lvl_symbol}{message}{RESET}{end}"
+    else:
+        log_string = f"{lvl_symbol}{message}{end}"
+
+    log_buffer = _log_buffer
+    if log_buffer is not None:
+        # The stream is captured now, so redirected output stays redirected
+        log_buffer.append((stream, log_string))
+        return
 
     # Use sys.stdout.write for finer control, especially with `end=""`
-    sys.stdout.write(log_string + end)
-    sys.stdout.flush()  # Ensure output is immediately visible
+    stream.write(log_string)
+    if _flush_each_write:
+        # Interactive output must be visible immediately; otherwise the stream's own buffering applies
+        stream.flush()
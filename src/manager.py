@@ -1,12 +1,74 @@
 # src/manager.py
+import contextlib
+import hashlib
 import importlib.util
 import inspect
 import os
 import sys
-from typing import Any, Dict, Optional, Type
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Type
 
-from src.base_component import BaseComponent
+from src.base_component import BaseComponent, ToolError
+from src.bytecode_cache import BytecodeCache
 from src.logger import log_message
+from src.metrics import argument_bytes, get_metrics_registry, result_bytes
+from src.tracing import traced
+
+
+class ComponentLock:
+    """
+    Lets any number of component calls run concurrently while keeping
+    reloads exclusive: a reload waits for in-flight calls to finish and
+    new calls wait for a pending reload.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active_users = 0
+        self._pending_reloads = 0
+        self._reloading = False
+
+    @contextlib.contextmanager
+    def using(self):
+        with self._condition:
+            while self._reloading or self._pending_reloads:
+                self._condition.wait()
+            self._active_users += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active_users -= 1
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def reloading(self):
+        with self._condition:
+            self._pending_reloads += 1
+            while self._reloading or self._active_users:
+                self._condition.wait()
+            self._pending_reloads -= 1
+            self._reloading = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._reloading = False
+                self._condition.notify_all()
+
+
+class _PreparedModule(NamedTuple):
+    """
+    A component module that has been read and compiled but not executed yet.
+    """
+    module_name: str
+    file_path: str
+    signature: Optional[Tuple[int, int, str]]
+    code: Optional[types.CodeType]
+    error: Optional[Exception]
 
 
 class ComponentManager:
@@ -14,21 +76,62 @@ class ComponentManager:
     Manages the loading, lifecycle, and access of components.
     """
 
-    def __init__(self, components_dir: str = "components"):
+    def __init__(
+        self,
+        components_dir: str = "components",
+        incremental_reload: bool = False,
+        parallel_discovery: bool = False,
+        discovery_workers: Optional[int] = None,
+        use_bytecode_cache: bool = True,
+        bytecode_cache_dir: Optional[str] = None,
+    ):
         self.components_dir = components_dir
+        self.incremental_reload = incremental_reload
+        # Read and compile component files on a thread pool before executing them
+        self.parallel_discovery = parallel_discovery
+        self.discovery_workers = discovery_workers
+        # Compiled component code, keyed by source hash, reused across reloads and restarts
+        self.bytecode_cache: Optional[BytecodeCache] = None
+        if use_bytecode_cache:
+            self.bytecode_cache = BytecodeCache(
+                bytecode_cache_dir or os.path.join(components_dir, "__pycache__", "component_cache")
+            )
+        # Held for reading around component use and for writing around reloads
+        self.lock = ComponentLock()
+        # Serializes instantiation, since lazy loads can race between concurrent tool calls
+        self._load_lock = threading.RLock()
         self._loaded_components: Dict[str, BaseComponent] = {}
         self._available_component_classes: Dict[str, Type[BaseComponent]] = {}
+        # module name -> (mtime_ns, size, sha256 of source) as of its last import
+        self._module_signatures: Dict[str, Tuple[int, int, str]] = {}
+        # module name -> component class names it contributed
+        self._module_component_names: Dict[str, List[str]] = {}
+        # module name -> global names its code references, to find modules importing a changed sibling
+        self._module_references: Dict[str, Set[str]] = {}
 
-    def refresh_components(self):
+    @traced()
+    def refresh_components(self) -> List[str]:
         """
         Clears existing loaded/available components, re-scans the directory,
         and re-imports all modules, making them available. This also handles
         unloading modules from sys.modules to ensure fresh code is loaded.
+
+        In incremental mode only modules whose files were added, removed or
+        modified since the last refresh are touched; components from
+        unchanged modules keep their loaded instances.
+
+        Returns the names of the modules that were (re)imported or removed.
         """
+        if self.incremental_reload:
+            return self._refresh_changed_components()
+
         self.unload_all_components()
 
         # Clear existing available component classes
         self._available_component_classes = {}
+        self._module_signatures = {}
+        self._module_component_names = {}
+        self._module_references = {}
 
         # Reset sys.modules for affected component modules to force reload
         # This is crucial for picking up modifications to existing files.
@@ -40,7 +143,127 @@ class ComponentManager:
                     del sys.modules[module_name]
 
         self._auto_import_components()
+        return list(self._module_signatures.keys())
+
+    def _refresh_changed_components(self) -> List[str]:
+        """
+        Re-imports only the component modules whose files changed on disk.
+
+        A file is considered unchanged when its mtime and size match the
+        last import; otherwise its content hash decides, so a touched but
+        identical file is not reloaded.
+        """
+        current_files = self._scan_component_files()
+
+        changed_modules = []
+        for module_name, (file_path, stat) in current_files.items():
+            previous = self._module_signatures.get(module_name)
+            if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                digest = self._hash_file(file_path)
+            except OSError as e:
+                log_message("WARNING", f"Could not read component file '{file_path}': {e}")
+                continue
+            if previous and previous[2] == digest:
+                self._module_signatures[module_name] = (stat.st_mtime_ns, stat.st_size, digest)
+                continue
+            changed_modules.append(module_name)
+
+        removed_modules = [
+            module_name for module_name in self._module_signatures
+            if module_name not in current_files
+        ]
+
+        if not changed_modules and not removed_modules:
+            log_message("SYSTEM_RELOAD", "No component changes detected.")
+            return []
+
+        # Modules importing a changed or removed sibling would keep the old module object
+        dependent_modules = [
+            module_name
+            for module_name in self._dependent_modules(set(changed_modules) | set(removed_modules))
+            if module_name in current_files
+        ]
+        changed_modules += dependent_modules
+
+        for module_name in removed_modules + changed_modules:
+            self._forget_module(module_name)
 
+        self._import_component_modules({
+            module_name: current_files[module_name][0] for module_name in changed_modules
+        })
+
+        log_message("SYSTEM_RELOAD",
+            f"Incremental reload: {len(changed_modules) - len(dependent_modules)} changed, "
+            f"{len(dependent_modules)} dependent, {len(removed_modules)} removed, "
+            f"{len(current_files) - len(changed_modules)} unchanged."
+        )
+        return removed_modules + changed_modules
+
+    def _dependent_modules(self, modules: Set[str]) -> List[str]:
+        """
+        Returns the imported component modules that reference any of `modules`,
+        directly or through other component modules, nearest first.
+        """
+        dependents: List[str] = []
+        affected = set(modules)
+        frontier = set(modules)
+        while frontier:
+            next_frontier = {
+                module_name for module_name, references in self._module_references.items()
+                if module_name not in affected and references & frontier
+            }
+            dependents.extend(sorted(next_frontier))
+            affected |= next_frontier
+            frontier = next_frontier
+        return dependents
+
+    def _scan_component_files(self) -> Dict[str, Tuple[str, os.stat_result]]:
+        """
+        Returns a mapping of module name to (file path, stat result) for every
+        component file in `components_dir`.
+        """
+        files: Dict[str, Tuple[str, os.stat_result]] = {}
+        if not os.path.isdir(self.components_dir):
+            return files
+
+        with os.scandir(self.components_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".py") and entry.name != "__init__.py" and entry.is_file():
+                    files[entry.name[:-3]] = (entry.path, entry.stat())
+        return files
+
+    def module_source_hash(self, module_name: str) -> Optional[str]:
+        """
+        Returns the sha256 of a component module's source as of its last
+        import, or None if the module was not imported from `components_dir`.
+        """
+        signature = self._module_signatures.get(module_name)
+        return signature[2] if signature else None
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _forget_module(self, module_name: str):
+        """
+        Unloads the components contributed by a module and drops the module
+        itself so its next import executes fresh code.
+        """
+        for component_name in self._module_component_names.pop(module_name, []):
+            if component_name in self._loaded_components:
+                self.unload_component(component_name)
+            self._available_component_classes.pop(component_name, None)
+
+        self._module_signatures.pop(module_name, None)
+        self._module_references.pop(module_name, None)
+        if module_name in sys.modules:
+            log_message("SYSTEM_RELOAD", f"Unloading module from sys.modules: {module_name}")
+            del sys.modules[module_name]
+
+    @traced()
     def _auto_import_components(self):
         """
         Scans the `components_dir` for Python files, imports them,
@@ -50,35 +273,155 @@ class ComponentManager:
             log_message("WARNING", f"Components directory '{self.components_dir}' not found. No components will be loaded.")
             return
 
+        self._import_component_modules({
+            module_name: file_path
+            for module_name, (file_path, _) in self._scan_component_files().items()
+        })
+
+    @traced()
+    def _import_component_modules(self, files: Dict[str, str]):
+        """
+        Imports the given component modules (module name -> file path).
+
+        Sequentially, each file is read, compiled and executed in turn. With
+        `parallel_discovery`, all files are read, hashed and compiled on a
+        thread pool first and then executed in dependency order on the
+        calling thread.
+        """
+        if not files:
+            return
+
         # Add components dir to sys.path temporarily for module discovery
         sys.path.insert(0, self.components_dir)
 
-        for filename in os.listdir(self.components_dir):
-            if filename.endswith(".py") and filename != "__init__.py":
-                module_name = filename[:-3]
-                file_path = os.path.join(self.components_dir, filename)
-
-                try:
-                    spec = importlib.util.spec_from_file_location(
-                        module_name, file_path
+        try:
+            if self.parallel_discovery and len(files) > 1:
+                with ThreadPoolExecutor(max_workers=self.discovery_workers) as executor:
+                    prepared_modules = list(executor.map(
+                        self._prepare_component_module, files.keys(), files.values()
+                    ))
+                for prepared in self._in_dependency_order(prepared_modules):
+                    self._exec_component_module(prepared)
+            else:
+                for module_name, file_path in files.items():
+                    self._exec_component_module(
+                        self._prepare_component_module(module_name, file_path)
                     )
-                    if spec and spec.loader:
-                        module = importlib.util.module_from_spec(spec)
-                        sys.modules[module_name] = module
-                        spec.loader.exec_module(module)
-                        self._discover_component_classes(module)
-                        log_message("SYSTEM_RELOAD", f"Imported module: {module_name}")
-                    else:
-                        log_message("WARNING", f"Could not load spec for module: {module_name}")
-                except Exception as e:
-                    log_message("AI_UNEXPECTED_ERROR", f"Error importing module {module_name}: {e}")
+        finally:
+            sys.path.pop(0)
+
+    def _prepare_component_module(self, module_name: str, file_path: str) -> _PreparedModule:
+        """
+        Reads, hashes and compiles a component module without executing it,
+        using the bytecode cache when the source is unchanged.
+        Safe to call from worker threads.
+        """
+        try:
+            stat = os.stat(file_path)
+            with open(file_path, "rb") as f:
+                source = f.read()
+        except OSError as e:
+            return _PreparedModule(module_name, file_path, None, None, e)
+
+        source_hash = hashlib.sha256(source).hexdigest()
+        signature = (stat.st_mtime_ns, stat.st_size, source_hash)
+
+        if self.bytecode_cache:
+            code = self.bytecode_cache.load(module_name, file_path, source_hash)
+            if code is not None:
+                return _PreparedModule(module_name, file_path, signature, code, None)
 
-        sys.path.pop(0)
+        try:
+            code = compile(source, file_path, "exec", dont_inherit=True)
+        except (SyntaxError, ValueError) as e:
+            return _PreparedModule(module_name, file_path, signature, None, e)
+
+        if self.bytecode_cache:
+            self.bytecode_cache.store(module_name, file_path, source_hash, code)
+        return _PreparedModule(module_name, file_path, signature, code, None)
+
+    def _exec_component_module(self, prepared: _PreparedModule):
+        """
+        Executes a prepared component module, discovers its component classes
+        and records the file signature used for incremental reloads.
+        """
+        module_name = prepared.module_name
+        if prepared.signature is None:
+            log_message("AI_UNEXPECTED_ERROR", f"Error reading module {module_name}: {prepared.error}")
+            return
+
+        # Recorded even if the import fails, so a broken file is retried only once it changes.
+        self._module_signatures[module_name] = prepared.signature
+        if prepared.code:
+            self._module_references[module_name] = self._referenced_names(prepared.code)
+
+        if prepared.error:
+            log_message("AI_UNEXPECTED_ERROR", f"Error importing module {module_name}: {prepared.error}")
+            return
+
+        try:
+            spec = importlib.util.spec_from_file_location(
+                module_name, prepared.file_path
+            )
+            if spec and spec.loader:
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                exec(prepared.code, module.__dict__)
+                self._module_component_names[module_name] = self._discover_component_classes(module)
+                log_message("SYSTEM_RELOAD", f"Imported module: {module_name}")
+            else:
+                log_message("WARNING", f"Could not load spec for module: {module_name}")
+        except Exception as e:
+            sys.modules.pop(module_name, None)
+            log_message("AI_UNEXPECTED_ERROR", f"Error importing module {module_name}: {e}")
 
-    def _discover_component_classes(self, module):
+    @staticmethod
+    def _referenced_names(code: types.CodeType) -> Set[str]:
+        """
+        Collects the global names (including imported module names) referenced
+        by a code object and the code objects nested in it.
+        """
+        names: Set[str] = set()
+        pending = [code]
+        while pending:
+            current = pending.pop()
+            names.update(current.co_names)
+            pending.extend(const for const in current.co_consts if isinstance(const, types.CodeType))
+        return names
+
+    def _in_dependency_order(self, prepared_modules: List[_PreparedModule]) -> List[_PreparedModule]:
+        """
+        Orders prepared modules so that sibling component modules referenced by
+        a module are executed before it. Modules in an import cycle keep their
+        discovery order.
+        """
+        by_name = {prepared.module_name: prepared for prepared in prepared_modules}
+        dependencies = {
+            name: (self._referenced_names(prepared.code) & by_name.keys()) - {name}
+            if prepared.code else set()
+            for name, prepared in by_name.items()
+        }
+
+        ordered: List[_PreparedModule] = []
+        done: Set[str] = set()
+        remaining = list(by_name)
+        while remaining:
+            ready = [name for name in remaining if dependencies[name] <= done]
+            if not ready:
+                # Import cycle: break it at the first remaining module
+                ready = remaining[:1]
+            for name in ready:
+                ordered.append(by_name[name])
+                done.add(name)
+            remaining = [name for name in remaining if name not in done]
+        return ordered
+
+    def _discover_component_classes(self, module) -> List[str]:
         """
         Discovers subclasses of BaseComponent within an imported module.
+        Returns the names of the component classes registered from it.
         """
+        discovered: List[str] = []
         for name, obj in inspect.getmembers(module):
             if (
                 inspect.isclass(obj)
@@ -92,31 +435,34 @@ class ComponentManager:
                     )
                 else:
                     self._available_component_classes[component_name] = obj
+                    discovered.append(component_name)
                     log_message("SYSTEM_RELOAD", f"Discovered component class: {component_name}")
+        return discovered
 
     def load_component(self, component_class_name: str) -> Optional[BaseComponent]:
         """
         Loads and initializes a component by its class name.
         Calls the `onload` method of the component.
         """
-        if component_class_name in self._loaded_components:
-            log_message("SYSTEM_RELOAD", f"Component '{component_class_name}' is already loaded.")
-            return self._loaded_components[component_class_name]
+        with self._load_lock:
+            if component_class_name in self._loaded_components:
+                log_message("SYSTEM_RELOAD", f"Component '{component_class_name}' is already loaded.")
+                return self._loaded_components[component_class_name]
 
-        component_class = self._available_component_classes.get(component_class_name)
-        if not component_class:
-            log_message("AI_UNEXPECTED_ERROR", f"Component class '{component_class_name}' not found.")
-            return None
+            component_class = self._available_component_classes.get(component_class_name)
+            if not component_class:
+                log_message("AI_UNEXPECTED_ERROR", f"Component class '{component_class_name}' not found.")
+                return None
 
-        try:
-            component_instance = component_class(component_class_name)
-            component_instance.onload()
-            self._loaded_components[component_class_name] = component_instance
-            log_message("SYSTEM_RELOAD", f"Component '{component_class_name}' loaded successfully.")
-            return component_instance
-        except Exception as e:
-            log_message("AI_UNEXPECTED_ERROR", f"Error loading component '{component_class_name}': {e}")
-            return None
+            try:
+                component_instance = component_class(component_class_name)
+                component_instance.onload()
+                self._loaded_components[component_class_name] = component_instance
+                log_message("SYSTEM_RELOAD", f"Component '{component_class_name}' loaded successfully.")
+                return component_instance
+            except Exception as e:
+                log_message("AI_UNEXPECTED_ERROR", f"Error loading component '{component_class_name}': {e}")
+                return None
 
     def load_all_components(self):
         """
@@ -148,17 +494,26 @@ class ComponentManager:
         Retrieves a loaded component by its name and calls its 'use' method
         with the provided arguments.
         """
-        component = self._loaded_components.get(name)
-        if component:
-            try:
-                log_message("AI_ACTION", f"Attempting to use component '{name}'...")
-                return component.use(*args, **kwargs)
-            except Exception as e:
-                log_message("AI_UNEXPECTED_ERROR", f"Error using component '{name}': {e}")
+        with self.lock.using():
+            component = self._loaded_components.get(name)
+            if component:
+                bytes_in = argument_bytes(kwargs, args)
+                start = time.perf_counter()
+                try:
+                    log_message("AI_ACTION", f"Attempting to use component '{name}'...")
+                    result = component.use(*args, **kwargs)
+                    get_metrics_registry().record(
+                        name, time.perf_counter() - start, ok=not isinstance(result, ToolError),
+                        bytes_in=bytes_in, bytes_out=result_bytes(result),
+                    )
+                    return result
+                except Exception as e:
+                    get_metrics_registry().record(name, time.perf_counter() - start, ok=False, bytes_in=bytes_in)
+                    log_message("AI_UNEXPECTED_ERROR", f"Error using component '{name}': {e}")
+                    return None
+            else:
+                log_message("AI_UNEXPECTED_ERROR", f"Component '{name}' not found or not loaded.")
                 return None
-        else:
-            log_message("AI_UNEXPECTED_ERROR", f"Component '{name}' not found or not loaded.")
-            return None
 
     def unload_component(self, name: str):
         """
@@ -195,6 +550,13 @@ class ComponentManager:
         """
         return self._loaded_components
 
+    @property
+    def available_component_classes(self) -> Dict[str, Type[BaseComponent]]:
+        """
+        Returns a dictionary of discovered component classes, loaded or not.
+        """
+        return self._available_component_classes
+
     def list_available_components(self):
         """
         Lists all discovered component classes.
@@ -0,0 +1,177 @@
+# src/metrics.py
+import bisect
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Upper bounds of the latency histogram buckets, in milliseconds (the last bucket is unbounded)
+LATENCY_BUCKETS_MS = [
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1_000, 2_500, 5_000, 10_000, 30_000, 60_000, 120_000,
+]
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Percentiles are interpolated within the
+    bucket they fall in and clamped to the observed minimum and maximum.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def record(self, duration_ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = duration_ms if self.min_ms is None else min(self.min_ms, duration_ms)
+        self.max_ms = duration_ms if self.max_ms is None else max(self.max_ms, duration_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min_ms), self.max_ms)
+            seen += bucket_count
+        return self.max_ms
+
+
+class ComponentStats:
+    """
+    Call statistics of one component.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.last_used: Optional[float] = None
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+            "mean_ms": self.latency.total_ms / self.calls if self.calls else None,
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+            "p99_ms": self.latency.percentile(99),
+            "max_ms": self.latency.max_ms,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "last_used": self.last_used,
+        }
+
+
+class MetricsRegistry:
+    """
+    Per-component call count, error count, latency histogram, bytes in/out
+    and last-used time, for finding slow or unused components.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, ComponentStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, component: str, duration: float, ok: bool = True, bytes_in: int = 0, bytes_out: int = 0):
+        """
+        Records one call of `component` that took `duration` seconds.
+        """
+        with self._lock:
+            stats = self._stats.get(component)
+            if stats is None:
+                stats = self._stats[component] = ComponentStats(component)
+            stats.calls += 1
+            if not ok:
+                stats.errors += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.last_used = time.time()
+            stats.latency.record(duration * 1000)
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Returns the statistics of every component that has been called.
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def get(self, component: str) -> Optional[Dict[str, Optional[float]]]:
+        with self._lock:
+            stats = self._stats.get(component)
+            return stats.as_dict() if stats else None
+
+    def reset(self, component: Optional[str] = None):
+        with self._lock:
+            if component is None:
+                self._stats.clear()
+            else:
+                self._stats.pop(component, None)
+
+    def format_table(self, sort_by: str = "p95_ms") -> str:
+        """
+        Renders the statistics as a text table, highest `sort_by` first.
+        """
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "No component calls recorded yet."
+
+        def sort_key(item) -> float:
+            value = item[1].get(sort_by)
+            return value if isinstance(value, (int, float)) else -1.0
+
+        def ms(value: Optional[float]) -> str:
+            return f"{value:.1f}" if value is not None else "-"
+
+        now = time.time()
+        lines: List[str] = [
+            f"{'component':<30} {'calls':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'bytes in':>9} {'bytes out':>10} {'last used':>10}"
+        ]
+        for name, stats in sorted(snapshot.items(), key=sort_key, reverse=True):
+            idle = f"{now - stats['last_used']:.0f}s ago" if stats["last_used"] else "-"
+            lines.append(
+                f"{name:<30} {stats['calls']:>6} {stats['errors']:>6} {ms(stats['p50_ms']):>9} "
+                f"{ms(stats['p95_ms']):>9} {ms(stats['p99_ms']):>9} {stats['bytes_in']:>9} "
+                f"{stats['bytes_out']:>10} {idle:>10}"
+            )
+        return "\n".join(lines)
+
+
+def argument_bytes(kwargs: Optional[Dict[str, Any]], args: Sequence[Any] = ()) -> int:
+    """
+    Returns the size of a call's arguments as JSON, as counted in `bytes_in`.
+    """
+    payload = {"args": list(args), **(kwargs or {})} if args else (kwargs or {})
+    return len(json.dumps(payload, default=str).encode("utf-8"))
+
+
+def result_bytes(result: Any) -> int:
+    """
+    Returns the size of a call's result as text, as counted in `bytes_out`.
+    """
+    return len(str(result).encode("utf-8"))
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    Returns the process-wide registry filled by tool calls and ComponentManager.use_component.
+    """
+    return _registry
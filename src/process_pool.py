@@ -0,0 +1,224 @@
+# src/process_pool.py
+import multiprocessing
+import pickle
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.base_component import ToolError
+from src.logger import log_message
+
+
+def _worker_main(components_dir: str, max_result_bytes: int, connection):
+    """
+    Entry point of a worker process: preloads every component into its own
+    ComponentManager and serves calls from the parent until told to stop.
+    """
+    from src.manager import ComponentManager
+
+    manager = ComponentManager(components_dir, incremental_reload=True)
+    manager.refresh_components()
+    manager.load_all_components()
+    connection.send(("ready", None))
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+
+        command = message[0]
+        if command == "stop":
+            break
+
+        if command == "reload":
+            manager.refresh_components()
+            manager.load_all_components()
+            connection.send(("ok", None))
+            continue
+
+        _, component_name, kwargs = message
+        component = manager.get_component(component_name)
+        if not component and component_name in manager.available_component_classes:
+            component = manager.load_component(component_name)
+        if not component:
+            connection.send(("error", f"Error: Component '{component_name}' not found."))
+            continue
+
+        try:
+            result = component.use(**kwargs)
+        except Exception as e:
+            connection.send(("error", f"Error executing tool '{component_name}': {e}"))
+            continue
+
+        try:
+            payload = pickle.dumps(result)
+        except Exception:
+            payload = pickle.dumps(str(result))
+        if len(payload) > max_result_bytes:
+            connection.send((
+                "error",
+                f"Error: Result of tool '{component_name}' is {len(payload)} bytes, "
+                f"over the {max_result_bytes} byte limit.",
+            ))
+        else:
+            connection.send(("ok", payload))
+
+
+class _Worker:
+    """
+    A worker process and the parent's end of its pipe.
+    """
+
+    def __init__(self, context, components_dir: str, max_result_bytes: int):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(components_dir, max_result_bytes, child_connection),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            return self.connection.poll(timeout) and self.connection.recv()[0] == "ready"
+        except (EOFError, OSError):
+            return False
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.connection.close()
+
+
+class ComponentProcessPool:
+    """
+    Executes component `use` calls in a pool of warm worker processes, so a
+    slow or CPU-heavy component cannot block the agent loop and several calls
+    can use several cores.
+
+    Each worker preloads all components in its own interpreter. Calls are
+    subject to a timeout and a pickled result size limit; a worker that times
+    out or crashes is killed and replaced. Component state lives in the
+    workers and is not shared between them.
+    """
+
+    def __init__(
+        self,
+        components_dir: str,
+        size: int = 2,
+        call_timeout: float = 60.0,
+        max_result_bytes: int = 1_000_000,
+        startup_timeout: float = 60.0,
+    ):
+        self.components_dir = components_dir
+        self.size = size
+        self.call_timeout = call_timeout
+        self.max_result_bytes = max_result_bytes
+        self.startup_timeout = startup_timeout
+        # Spawned rather than forked: the parent runs watcher and tool threads
+        self._context = multiprocessing.get_context("spawn")
+        self._idle_workers: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self.recycled_workers = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """
+        Starts the worker processes. Does nothing if the pool is already running.
+        """
+        with self._lock:
+            if self._workers:
+                return
+            for _ in range(self.size):
+                self._workers.append(self._spawn_worker())
+            for worker in self._workers:
+                if not worker.wait_ready(self.startup_timeout):
+                    log_message("WARNING", f"Component worker (pid {worker.process.pid}) did not start cleanly.")
+                self._idle_workers.put(worker)
+        log_message("SYSTEM_INIT", f"Started component process pool with {self.size} workers.")
+
+    def shutdown(self):
+        """
+        Stops all worker processes.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._idle_workers = queue.Queue()
+        for worker in workers:
+            try:
+                worker.connection.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            worker.process.join(timeout=5)
+            worker.kill()
+        if workers:
+            log_message("SYSTEM_EXIT", "Component process pool stopped.")
+
+    def _spawn_worker(self) -> _Worker:
+        return _Worker(self._context, self.components_dir, self.max_result_bytes)
+
+    def _replace_worker(self, worker: _Worker, reason: str):
+        """
+        Kills a misbehaving worker and puts a fresh one in its place.
+        """
+        log_message("WARNING", f"Recycling component worker (pid {worker.process.pid}): {reason}")
+        worker.kill()
+        replacement = self._spawn_worker()
+        with self._lock:
+            if worker in self._workers:
+                self._workers[self._workers.index(worker)] = replacement
+        self.recycled_workers += 1
+        replacement.wait_ready(self.startup_timeout)
+        self._idle_workers.put(replacement)
+
+    def call(self, component_name: str, kwargs: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Calls `use(**kwargs)` on a component inside a worker process.
+        Errors, timeouts and oversized results are returned as ToolError
+        messages, the same way in-process tool errors are.
+        """
+        if not self.started:
+            self.start()
+
+        timeout = self.call_timeout if timeout is None else timeout
+        worker = self._idle_workers.get()
+        try:
+            worker.connection.send(("call", component_name, dict(kwargs or {})))
+            if not worker.connection.poll(timeout):
+                self._replace_worker(worker, f"call to '{component_name}' timed out after {timeout}s")
+                return ToolError(f"Error: Tool '{component_name}' timed out after {timeout} seconds.")
+            status, payload = worker.connection.recv()
+        except (EOFError, OSError) as e:
+            self._replace_worker(worker, f"worker crashed during call to '{component_name}' ({e!r})")
+            return ToolError(f"Error: Tool '{component_name}' crashed its worker process.")
+
+        self._idle_workers.put(worker)
+        if status == "ok":
+            return pickle.loads(payload)
+        return ToolError(payload)
+
+    def reload(self):
+        """
+        Tells every worker to pick up component changes. Waits for busy workers
+        to finish their current call first.
+        """
+        if not self.started:
+            return
+
+        workers = [self._idle_workers.get() for _ in range(self.size)]
+        for worker in workers:
+            try:
+                worker.connection.send(("reload",))
+                if not worker.connection.poll(self.startup_timeout):
+                    raise TimeoutError("reload timed out")
+                worker.connection.recv()
+                self._idle_workers.put(worker)
+            except (EOFError, OSError, TimeoutError) as e:
+                self._replace_worker(worker, f"reload failed ({e!r})")
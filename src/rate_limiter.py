@@ -0,0 +1,198 @@
+# src/rate_limiter.py
+import asyncio
+import os
+import threading
+import time
+from typing import List, Optional
+
+from src.event_log import emit_event
+from src.logger import log_message
+
+
+class _TokenBucket:
+    """
+    A bucket holding up to `capacity` units that refills evenly over `period` seconds.
+    """
+
+    def __init__(self, name: str, capacity: int, period: float):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.available = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` units are available. Assumes `refill` was just called.
+        """
+        # A single request larger than the whole bucket only waits for a full bucket
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.refill_rate)
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter for Gemini requests.
+
+    Enforces requests per minute, tokens per minute and requests per day at
+    the same time; a limit of None is not enforced. `try_acquire` never
+    blocks and `estimate_wait` tells a caller how long it would have to wait,
+    so a scheduler can do other work in the meantime. `acquire` blocks until
+    the request fits within every limit.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = 15,
+        tokens_per_minute: Optional[int] = None,
+        requests_per_day: Optional[int] = None,
+    ):
+        self._requests: List[_TokenBucket] = []
+        self._tokens: Optional[_TokenBucket] = None
+        if requests_per_minute:
+            self._requests.append(_TokenBucket("requests per minute", requests_per_minute, 60.0))
+        if requests_per_day:
+            self._requests.append(_TokenBucket("requests per day", requests_per_day, 86400.0))
+        if tokens_per_minute:
+            self._tokens = _TokenBucket("tokens per minute", tokens_per_minute, 60.0)
+        self._lock = threading.Lock()
+
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.total_wait = 0.0
+
+    def _wait_time(self, tokens: int) -> float:
+        """
+        Seconds until a request of `tokens` fits within every limit. Must be called with the lock held.
+        """
+        now = time.monotonic()
+        wait = 0.0
+        for bucket in self._requests:
+            bucket.refill(now)
+            wait = max(wait, bucket.wait_time(1))
+        if self._tokens and tokens:
+            self._tokens.refill(now)
+            wait = max(wait, self._tokens.wait_time(tokens))
+        return wait
+
+    def estimate_wait(self, tokens: int = 0) -> float:
+        """
+        Returns how many seconds a request of `tokens` estimated tokens would
+        have to wait right now. 0 means `try_acquire` would succeed.
+        """
+        with self._lock:
+            return self._wait_time(tokens)
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """
+        Takes one request and `tokens` tokens from the budgets if they are all
+        available, without blocking. Returns whether it did.
+        """
+        with self._lock:
+            if self._wait_time(tokens) > 0:
+                return False
+            for bucket in self._requests:
+                bucket.available -= 1
+            if self._tokens and tokens:
+                # May go negative for a request larger than the whole bucket;
+                # later requests then wait for the excess to refill.
+                self._tokens.available -= tokens
+            self.total_requests += 1
+            self.total_tokens += tokens
+            return True
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a request of `tokens` tokens is allowed and takes it from
+        the budgets. Returns False if that would take longer than `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        started = time.monotonic()
+        logged = False
+        while not self.try_acquire(tokens):
+            wait = self.estimate_wait(tokens)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                emit_event("rate_limit_wait", "WARNING", duration_ms=(time.monotonic() - started) * 1000,
+                           tokens=tokens, timed_out=True)
+                return False
+            if not logged:
+                log_message("RATE_LIMIT", f"Waiting for {wait:.2f} seconds...")
+                logged = True
+            time.sleep(wait)
+        waited = time.monotonic() - started
+        if logged:
+            with self._lock:
+                self.total_wait += waited
+            emit_event("rate_limit_wait", duration_ms=waited * 1000, tokens=tokens)
+        return True
+
+    async def acquire_async(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Like `acquire`, but waits with `asyncio.sleep` so other coroutines keep running.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        started = time.monotonic()
+        logged = False
+        while not self.try_acquire(tokens):
+            wait = self.estimate_wait(tokens)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                emit_event("rate_limit_wait", "WARNING", duration_ms=(time.monotonic() - started) * 1000,
+                           tokens=tokens, timed_out=True)
+                return False
+            if not logged:
+                log_message("RATE_LIMIT", f"Waiting for {wait:.2f} seconds...")
+                logged = True
+            await asyncio.sleep(wait)
+        waited = time.monotonic() - started
+        if logged:
+            with self._lock:
+                self.total_wait += waited
+            emit_event("rate_limit_wait", duration_ms=waited * 1000, tokens=tokens)
+        return True
+
+    def record_tokens(self, tokens: int):
+        """
+        Charges tokens that were used beyond the estimate given to `acquire`
+        (negative to refund an overestimate).
+        """
+        with self._lock:
+            if self._tokens:
+                self._tokens.refill(time.monotonic())
+                self._tokens.available = min(self._tokens.capacity, self._tokens.available - tokens)
+            self.total_tokens += tokens
+
+
+def _limit_from_env(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value) or None
+    except ValueError:
+        log_message("WARNING", f"Ignoring invalid {name}={value!r}; using {default}.")
+        return default
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide limiter shared by all agents and GeminiAPIAccess
+    instances. Limits come from GEMINI_RPM (default 15), GEMINI_TPM and
+    GEMINI_RPD (not enforced by default); 0 disables a limit.
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                requests_per_minute=_limit_from_env("GEMINI_RPM", 15),
+                tokens_per_minute=_limit_from_env("GEMINI_TPM", None),
+                requests_per_day=_limit_from_env("GEMINI_RPD", None),
+            )
+        return _shared_limiter
@@ -0,0 +1,165 @@
+# src/response_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.logger import log_message
+
+
+class ResponseCache:
+    """
+    Exact-match cache of model responses to prompts.
+
+    Prompts are normalized (surrounding whitespace stripped, inner runs of
+    whitespace collapsed) and hashed together with the endpoint they were
+    sent to. Entries expire after `ttl` seconds and the least recently used
+    ones are dropped beyond `max_entries`. If `path` is set the cache is
+    loaded from and saved to that JSON file, so it survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 3600.0, max_entries: int = 256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (stored at, response); most recently used last
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._load()
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return " ".join(prompt.split())
+
+    def key(self, prompt: str, endpoint: str = "") -> str:
+        return hashlib.sha256(f"{endpoint}\0{self.normalize(prompt)}".encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str, endpoint: str = "") -> Optional[str]:
+        """
+        Returns the cached response to a prompt, or None on a miss.
+        """
+        key = self.key(prompt, endpoint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, prompt: str, response: str, endpoint: str = ""):
+        """
+        Stores a response, evicting the least recently used entries beyond `max_entries`.
+        """
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            key = self.key(prompt, endpoint)
+            self._entries[key] = (time.time(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                self._save()
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns hit and miss counts, the hit rate and the number of entries.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _read_file(self) -> "OrderedDict[str, Tuple[float, str]]":
+        """
+        Returns the unexpired entries stored in `path`, oldest-used first.
+        """
+        entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return entries
+        except (OSError, ValueError) as e:
+            log_message("WARNING", f"Ignoring unreadable response cache {self.path}: {e}")
+            return entries
+
+        now = time.time()
+        for key, stored_at, response in stored.get("entries", []):
+            if now - stored_at < self.ttl:
+                entries[key] = (stored_at, response)
+        return entries
+
+    def _load(self):
+        # Stored oldest-used first, so the LRU order survives
+        self._entries = self._read_file()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        """
+        Writes the cache to `path`. Must be called with the lock held.
+
+        Entries other processes saved since this one last read the file are
+        merged in first (as less recently used than this process' own), so
+        processes sharing the file do not drop each other's entries.
+        """
+        merged = OrderedDict(
+            (key, entry) for key, entry in self._read_file().items() if key not in self._entries
+        )
+        merged.update(self._entries)
+        while len(merged) > self.max_entries:
+            merged.popitem(last=False)
+        self._entries = merged
+
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"entries": [[key, stored_at, response] for key, (stored_at, response) in self._entries.items()]},
+                    f,
+                )
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            log_message("WARNING", f"Could not save response cache to {self.path}: {e}")
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the process-wide cache used by GeminiAPIAccess. Configured by
+    GEMINI_RESPONSE_CACHE_PATH (default .cache/gemini_responses.json, empty
+    for memory only), GEMINI_RESPONSE_CACHE_TTL in seconds (default 3600, 0
+    disables caching) and GEMINI_RESPONSE_CACHE_SIZE (default 256 entries).
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                ttl = float(os.environ.get("GEMINI_RESPONSE_CACHE_TTL", "3600"))
+                max_entries = int(os.environ.get("GEMINI_RESPONSE_CACHE_SIZE", "256"))
+            except ValueError as e:
+                log_message("WARNING", f"Invalid response cache setting ({e}); using defaults.")
+                ttl, max_entries = 3600.0, 256
+            path = os.environ.get("GEMINI_RESPONSE_CACHE_PATH", os.path.join(".cache", "gemini_responses.json"))
+            _shared_cache = ResponseCache(path or None, ttl=ttl, max_entries=max_entries)
+        return _shared_cache
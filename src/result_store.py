@@ -0,0 +1,157 @@
+# src/result_store.py
+import contextlib
+import contextvars
+import itertools
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+from src.logger import log_message
+
+
+class ToolResultStore:
+    """
+    Keeps large tool results out of the chat history.
+
+    Results longer than `threshold_chars` are stored under a handle and
+    replaced in the history by a short preview that names the handle; the
+    ToolResultReader component pages through the full text. Stored results
+    are kept in memory up to `max_memory_chars` and the oldest ones are
+    spilled to files in `spill_dir` beyond that.
+    """
+
+    # Pages read back through this tool are never offloaded again
+    READER_TOOL_NAME = "ToolResultReader"
+    # Ends every preview returned by `offload`
+    _PREVIEW_TRAILER = re.compile(r"call ToolResultReader with handle='[^']+' and offset=\d+ to read more\.\]\Z")
+
+    def __init__(
+        self,
+        threshold_chars: int = 4000,
+        preview_chars: int = 1000,
+        max_memory_chars: int = 5_000_000,
+        spill_dir: Optional[str] = None,
+    ):
+        self.threshold_chars = threshold_chars
+        self.preview_chars = preview_chars
+        self.max_memory_chars = max_memory_chars
+        self.spill_dir = spill_dir
+        self._in_memory: "OrderedDict[str, str]" = OrderedDict()
+        self._in_memory_chars = 0
+        self._spilled: Dict[str, str] = {}
+        self._lengths: Dict[str, int] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def offload(self, tool_name: str, text: str) -> str:
+        """
+        Returns `text` unchanged if it is small, otherwise stores it and returns
+        a preview with a handle to the full result.
+        """
+        if len(text) <= self.threshold_chars or tool_name == self.READER_TOOL_NAME:
+            return text
+
+        with self._lock:
+            handle = f"{tool_name}-{next(self._counter)}"
+            self._in_memory[handle] = text
+            self._lengths[handle] = len(text)
+            self._in_memory_chars += len(text)
+            self._spill_oldest()
+
+        return (
+            f"{text[:self.preview_chars]}\n"
+            f"[... {len(text) - self.preview_chars} more characters ({len(text)} total). "
+            f"The full result is stored as '{handle}'; call ToolResultReader with "
+            f"handle='{handle}' and offset={self.preview_chars} to read more.]"
+        )
+
+    @classmethod
+    def is_preview(cls, text: str) -> bool:
+        """
+        Returns whether `text` is a preview returned by `offload`; it is already
+        short, and cutting it would lose the handle to the full result.
+        """
+        return bool(cls._PREVIEW_TRAILER.search(text[-300:]))
+
+    def _spill_oldest(self):
+        """
+        Moves the oldest in-memory results to disk until the memory limit holds.
+        Must be called with the lock held.
+        """
+        while self._in_memory_chars > self.max_memory_chars and len(self._in_memory) > 1:
+            handle, text = self._in_memory.popitem(last=False)
+            self._in_memory_chars -= len(text)
+            try:
+                if not self.spill_dir:
+                    self.spill_dir = tempfile.mkdtemp(prefix="tool_results_")
+                path = os.path.join(self.spill_dir, f"{handle}.txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                self._spilled[handle] = path
+            except OSError as e:
+                self._lengths.pop(handle, None)
+                log_message("WARNING", f"Could not spill tool result '{handle}' to disk, dropping it: {e}")
+
+    def read(self, handle: str, offset: int = 0, length: int = 4000) -> Optional[str]:
+        """
+        Returns `length` characters of a stored result starting at `offset`,
+        or None if the handle is unknown.
+        """
+        with self._lock:
+            text = self._in_memory.get(handle)
+            path = self._spilled.get(handle)
+        if text is None and path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except OSError:
+                return None
+        if text is None:
+            return None
+        return text[offset:offset + length]
+
+    def size(self, handle: str) -> Optional[int]:
+        """
+        Returns the length of a stored result, or None if the handle is unknown.
+        """
+        with self._lock:
+            return self._lengths.get(handle)
+
+
+_default_store: Optional[ToolResultStore] = None
+_default_store_lock = threading.Lock()
+_active_store: contextvars.ContextVar[Optional[ToolResultStore]] = contextvars.ContextVar(
+    "active_result_store", default=None
+)
+
+
+@contextlib.contextmanager
+def using_result_store(store: ToolResultStore) -> Iterator[ToolResultStore]:
+    """
+    Makes `store` the one `get_result_store` returns inside the block, e.g.
+    while an agent with its own store runs a tool call.
+    """
+    token = _active_store.set(store)
+    try:
+        yield store
+    finally:
+        _active_store.reset(token)
+
+
+def get_result_store() -> ToolResultStore:
+    """
+    Returns the result store of the agent whose tool call is running, or
+    otherwise the process-wide store shared by agents and the
+    ToolResultReader component.
+    """
+    global _default_store
+    active = _active_store.get()
+    if active is not None:
+        return active
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ToolResultStore()
+        return _default_store
@@ -0,0 +1,172 @@
+# src/session_runner.py
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, Optional
+
+from google import genai
+
+from src.ai_manager import AIComponentManager
+from src.component_watcher import ComponentWatcher
+from src.gemini_chat_agent import create_gemini_client
+from src.logger import log_message
+from src.manager import ComponentManager
+from src.rate_limiter import RateLimiter, get_shared_rate_limiter
+
+
+class MultiSessionRunner:
+    """
+    Runs many independent autonomous sessions (each with its own system prompt
+    and chat history) in one process.
+
+    All sessions share one ComponentManager, so component classes are
+    discovered and reloaded once, one Gemini client and its HTTP connection
+    pool, and one rate limiter. Each session has its own component instances,
+    so component state is never shared between sessions. Without a watcher,
+    components are reloaded after every round (one turn per session), so
+    components written during a run become available.
+    Turns are scheduled round-robin with at most `max_concurrent_turns` in
+    flight. A turn is only started when the rate limiter could serve its
+    first request right away, so workers are not tied up waiting on the quota.
+    """
+
+    def __init__(
+        self,
+        components_dir: str = "components",
+        model_name: str = "gemini-1.5-flash-latest",
+        api_key: Optional[str] = None,
+        max_concurrent_turns: int = 4,
+        watch_components: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        gemini_client: Optional[genai.Client] = None,
+    ):
+        self.components_dir = components_dir
+        self.model_name = model_name
+        self.max_concurrent_turns = max_concurrent_turns
+        self.component_manager = ComponentManager(components_dir, incremental_reload=True)
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+
+        self.gemini_client = gemini_client or create_gemini_client(api_key)
+
+        self.sessions: Dict[str, AIComponentManager] = {}
+        self.turns_completed: Dict[str, int] = {}
+        self._sessions_lock = threading.Lock()
+
+        # One watcher reloads the shared component manager for all sessions
+        self.component_watcher: Optional[ComponentWatcher] = None
+        if watch_components:
+            self.component_watcher = ComponentWatcher(components_dir, self.reload_components)
+
+    def add_session(self, name: str, system_prompt: Optional[str] = None) -> AIComponentManager:
+        """
+        Creates a session with its own chat history and component instances on
+        the shared component classes, client and rate limiter.
+        """
+        if name in self.sessions:
+            raise ValueError(f"Session '{name}' already exists.")
+        session = AIComponentManager(
+            components_dir=self.components_dir,
+            model_name=self.model_name,
+            system_prompt=system_prompt,
+            watch_components=False,
+            component_manager=self.component_manager,
+            gemini_client=self.gemini_client,
+            rate_limiter=self.rate_limiter,
+            session_id=name,
+        )
+        with self._sessions_lock:
+            self.sessions[name] = session
+            self.turns_completed[name] = 0
+            # Sessions added while running get the current tools right away
+            first = next(iter(self.sessions.values()))
+            session.available_tools = first.available_tools
+        return session
+
+    def reload_components(self):
+        """
+        Reloads the shared components once and hands the rebuilt tools to every session.
+        """
+        with self._sessions_lock:
+            sessions = list(self.sessions.values())
+        if not sessions:
+            return
+        # The first session reloads the shared manager; all sessions use identical tools
+        sessions[0]._reload_components_and_tools()
+        for session in sessions[1:]:
+            session.available_tools = sessions[0].available_tools
+
+    def run(self, turns_per_session: Optional[int] = None, stop_event: Optional[threading.Event] = None):
+        """
+        Runs turns round-robin across all sessions until each has completed
+        `turns_per_session` turns (forever if None) or `stop_event` is set.
+        """
+        stop_event = stop_event or threading.Event()
+        self.reload_components()
+        if self.component_watcher:
+            self.component_watcher.start()
+        log_message("SYSTEM_INIT",
+            f"Running {len(self.sessions)} sessions, up to {self.max_concurrent_turns} turns at a time."
+        )
+
+        ready: Deque[str] = deque(self.sessions)
+        in_flight: Dict[Future, str] = {}
+        turns_since_reload = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_turns) as executor:
+                while (ready or in_flight) and not stop_event.is_set():
+                    quota_wait = 0.0
+                    while ready and len(in_flight) < self.max_concurrent_turns:
+                        name = ready[0]
+                        quota_wait = self.rate_limiter.estimate_wait(
+                            self.sessions[name].gemini_agent.estimate_request_tokens()
+                        )
+                        if quota_wait > 0:
+                            break
+                        ready.popleft()
+                        in_flight[executor.submit(self.sessions[name].run_turn)] = name
+
+                    if not in_flight:
+                        # Every session is waiting on the quota
+                        stop_event.wait(quota_wait)
+                        continue
+
+                    done, _ = wait(
+                        in_flight, timeout=quota_wait if ready and quota_wait > 0 else None,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        name = in_flight.pop(future)
+                        try:
+                            future.result()
+                        except Exception as e:
+                            log_message("AI_UNEXPECTED_ERROR", f"Session '{name}' failed its turn: {e}")
+                        self.turns_completed[name] += 1
+                        turns_since_reload += 1
+                        if turns_per_session is None or self.turns_completed[name] < turns_per_session:
+                            # Back of the queue: round-robin
+                            ready.append(name)
+
+                    if not self.component_watcher and turns_since_reload >= len(self.sessions):
+                        # A round is done; pick up components written during it
+                        self.reload_components()
+                        turns_since_reload = 0
+
+                    # Pick up sessions added while running
+                    with self._sessions_lock:
+                        for name in self.sessions:
+                            if name not in ready and name not in in_flight.values() and self.turns_completed[name] == 0:
+                                ready.append(name)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """
+        Stops the component watcher and every session's background workers.
+        """
+        if self.component_watcher:
+            self.component_watcher.stop()
+        for session in self.sessions.values():
+            session.shutdown()
+        log_message("SYSTEM_EXIT",
+            "Sessions finished: " + ", ".join(f"{name} ({turns} turns)" for name, turns in self.turns_completed.items())
+        )
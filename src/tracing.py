@@ -0,0 +1,297 @@
+# src/tracing.py
+import abc
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.logger import log_message
+
+
+class Span:
+    """
+    One timed operation. Spans opened inside another span's block become its children.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """
+    Stands in for a span while tracing is off.
+    """
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_exporters: List["SpanExporter"] = []
+_exporters_lock = threading.Lock()
+
+
+class SpanExporter(abc.ABC):
+    """
+    Receives every span when it ends.
+    """
+
+    @abc.abstractmethod
+    def export(self, span: Span):
+        """
+        Handles one finished span. Called on the thread that ended it.
+        """
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """
+    Keeps finished spans in a list, e.g. for tests and benchmarks.
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+
+class JsonlExporter(SpanExporter):
+    """
+    Appends each span to a file as one JSON object per line.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpFileExporter(SpanExporter):
+    """
+    Writes spans in the OTLP/JSON trace format, one ExportTraceServiceRequest
+    per line (the layout of the OpenTelemetry Collector's file exporter), so
+    the file can be loaded by OpenTelemetry tooling.
+    """
+
+    def __init__(self, path: str, service_name: str = "component-ai"):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.service_name = service_name
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            # STATUS_CODE_ERROR = 2, STATUS_CODE_UNSET = 0
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": [otlp_span]}],
+        }]}
+        line = json.dumps(request, default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+class FlameSummaryExporter(SpanExporter):
+    """
+    Logs a flame-style breakdown of each trace (e.g. one turn) when its root span ends.
+    """
+
+    def __init__(self, min_percent: float = 0.0):
+        self.min_percent = min_percent
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                return
+            del self._pending[span.trace_id]
+        log_message("SYSTEM_TIMING", "Trace breakdown:\n" + format_span_tree(spans, self.min_percent))
+
+
+def format_span_tree(spans: List[Span], min_percent: float = 0.0) -> str:
+    """
+    Renders spans as an indented tree with each span's duration and share of
+    its root, children in start order. Repeated sibling names (e.g. many tool
+    calls) are kept separate.
+    """
+    children: Dict[Optional[str], List[Span]] = {}
+    span_ids = {span.span_id for span in spans}
+    for span in spans:
+        # Spans whose parent is not in the list are shown as roots
+        parent = span.parent_id if span.parent_id in span_ids else None
+        children.setdefault(parent, []).append(span)
+
+    lines: List[str] = []
+
+    def render(span: Span, depth: int, root_ms: float):
+        percent = span.duration_ms / root_ms * 100 if root_ms else 100.0
+        if depth and percent < min_percent:
+            return
+        bar = "█" * max(1, int(percent / 5))
+        suffix = f"  [error: {span.error}]" if span.error else ""
+        lines.append(f"{'  ' * depth}{span.name:<{max(1, 40 - 2 * depth)}} {span.duration_ms:>10.2f}ms {percent:>5.1f}% {bar}{suffix}")
+        for child in sorted(children.get(span.span_id, []), key=lambda s: s.start_ns):
+            render(child, depth + 1, root_ms)
+
+    for root in sorted(children.get(None, []), key=lambda s: s.start_ns):
+        render(root, 0, root.duration_ms)
+    return "\n".join(lines)
+
+
+def add_exporter(exporter: SpanExporter) -> SpanExporter:
+    """
+    Starts sending finished spans to `exporter`. Tracing is off while there are none.
+    """
+    with _exporters_lock:
+        _exporters.append(exporter)
+    return exporter
+
+
+def remove_exporter(exporter: SpanExporter):
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+    exporter.shutdown()
+
+
+def tracing_enabled() -> bool:
+    return bool(_exporters)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Times the block as a span, a child of the enclosing span if there is one.
+    Yields the span so attributes can be added. Costs almost nothing while
+    no exporter is registered.
+    """
+    if not _exporters:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name,
+        parent.trace_id if parent else f"{random.getrandbits(128):032x}",
+        parent.span_id if parent else None,
+        attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        for exporter in list(_exporters):
+            try:
+                exporter.export(current)
+            except Exception as e:
+                log_message("WARNING", f"Span exporter {type(exporter).__name__} failed: {e}")
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator that runs every call of a function inside a span named after it.
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _exporters:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator